@@ -12,24 +12,578 @@ from pptx.util import Inches, Pt, Cm
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.dml import MSO_LINE_DASH_STYLE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import ImagePart
+import matplotlib.colors as mcolors
+from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 import numpy as np
+import csv
+import gc
+import hashlib
+import inspect
+import io
+import json
+import mmap
 import os
+import pickle
+import platform
+import re
+import sqlite3
+import struct
+import sys
 import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
 ##我改改改
 
 # 设置matplotlib中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
 plt.rcParams['axes.unicode_minus'] = False    # 用来正常显示负号
 
+# 图形渲染方式：raster为matplotlib位图，native为PPT原生形状（可编辑、无需位图）
+RENDERERS = ('raster', 'native')
+
+# 位图分辨率档位
+DPI_PROFILES = {
+    'draft': 96,
+    'screen': 150,
+    'print': 300,
+}
+
+# 语言：zh为原文（中文），zh-en为中英双语（由en目录自动组合）
+SOURCE_LOCALE = 'zh'
+LOCALES = ('zh', 'en', 'zh-en')
+
+# 字符串目录所在目录：<locale>.json为源文件，<locale>.pickle为编译后的缓存
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+
+# 每个进程只加载一次的字符串目录（多线程生成时由锁保护）
+_CATALOGS = {}
+_CATALOG_LOCK = threading.RLock()
+
+
+def compile_catalog(locale):
+    """把locales/<locale>.json编译为pickle并返回目录字典，无法写入时只返回字典"""
+    src = os.path.join(LOCALE_DIR, locale + '.json')
+    with open(src, encoding='utf-8') as f:
+        catalog = json.load(f)
+    compiled = os.path.join(LOCALE_DIR, locale + '.pickle')
+    # 先写临时文件再改名，其他进程或线程不会读到不完整的文件
+    tmp = f"{compiled}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, compiled)
+    except OSError:
+        pass
+    return catalog
+
+
+def load_catalog(locale):
+    """返回语言的字符串目录{消息ID: 译文}，消息ID为中文原文
+
+    优先读取比源文件新的pickle，否则重新编译；结果在进程内缓存。
+    """
+    if locale in _CATALOGS:
+        return _CATALOGS[locale]
+    if locale not in LOCALES:
+        raise ValueError(f"未知的语言: {locale}")
+    with _CATALOG_LOCK:
+        if locale not in _CATALOGS:
+            _CATALOGS[locale] = _read_catalog(locale)
+    return _CATALOGS[locale]
+
+
+def _read_catalog(locale):
+    """读取（必要时编译）语言的字符串目录"""
+    if locale == SOURCE_LOCALE:
+        catalog = {}
+    elif locale == 'zh-en':
+        # 中英文之间用\v连接：python-pptx把它写成同一段落内的换行（a:br），标题格式对两行都有效
+        catalog = {msgid: f"{msgid}\v{text}" for msgid, text in load_catalog('en').items()}
+    else:
+        src = os.path.join(LOCALE_DIR, locale + '.json')
+        compiled = os.path.join(LOCALE_DIR, locale + '.pickle')
+        try:
+            fresh = os.path.getmtime(compiled) >= os.path.getmtime(src)
+        except OSError:
+            fresh = False
+        if fresh:
+            with open(compiled, 'rb') as f:
+                catalog = pickle.load(f)
+        else:
+            catalog = compile_catalog(locale)
+    return catalog
+
+
+def _figure_fingerprint(fig, exclude=()):
+    """根据图形中各元素的几何和样式计算指纹，相同指纹的图形渲染结果相同"""
+    ax = fig.axes[0]
+    parts = [tuple(fig.get_size_inches()), ax.get_xlim(), ax.get_ylim(), ax.axison]
+    for line in ax.get_lines():
+        if line not in exclude and line.get_visible():
+            parts.append(('line', np.asarray(line.get_xydata()).round(6).tobytes(),
+                          mcolors.to_rgba(line.get_color()), line.get_linewidth(),
+                          line.get_linestyle(), line.get_marker(), line.get_markersize()))
+    for patch in ax.patches:
+        if patch not in exclude and patch.get_visible():
+            verts = patch.get_patch_transform().transform(patch.get_path().vertices)
+            parts.append(('patch', verts.round(6).tobytes(), patch.get_edgecolor(),
+                          patch.get_facecolor(), patch.get_fill(), patch.get_linewidth()))
+    for text in ax.texts:
+        if text not in exclude and text.get_visible():
+            parts.append(('text', text.get_text(), text.get_position(), getattr(text, 'xy', None),
+                          getattr(text, 'xyann', None), text.get_fontsize(),
+                          mcolors.to_rgba(text.get_color()), text.get_horizontalalignment()))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+# 确定性构建模式下zip条目使用的固定时间戳（zip格式最早只能表示1980年）
+DETERMINISTIC_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _deterministic_zip_date():
+    """返回确定性构建使用的zip时间戳，优先使用SOURCE_DATE_EPOCH环境变量"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        date = time.gmtime(int(epoch))[:6]
+        if date >= DETERMINISTIC_ZIP_DATE:
+            return date
+    return DETERMINISTIC_ZIP_DATE
+
+
+def normalize_pptx_bytes(data):
+    """重写pptx的zip容器：固定时间戳和文件属性，保持部件顺序稳定
+
+    [Content_Types].xml 固定放在首位，其余部件保持python-pptx的写出顺序
+    （按关系图遍历，对相同输入是稳定的）。
+    """
+    src = zipfile.ZipFile(io.BytesIO(data))
+    names = src.namelist()
+    names.sort(key=lambda name: name != '[Content_Types].xml')
+    parts = {name: src.read(name) for name in names}
+    src.close()
+    return _zip_parts(parts, _deterministic_zip_date())
+
+
+def _zip_parts(parts, date, compresslevel=None):
+    """按顺序把{部件名: 字节}写成zip容器，所有条目使用相同的时间戳和文件属性"""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as dst:
+        for name, payload in parts.items():
+            info = zipfile.ZipInfo(name, date_time=date)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = 0o644 << 16
+            dst.writestr(info, payload, compresslevel=compresslevel)
+    return out.getvalue()
+
+
+# 体积预算下图片的压缩档位，按画质损失从小到大排列：(缩放比例, 是否转为256色调色板)
+# 示意图只用到少数几种颜色，调色板几乎无损，因此排在降低分辨率之前
+IMAGE_BUDGET_STEPS = (
+    (1.0, False),
+    (1.0, True),
+    (0.75, True),
+    (0.5, True),
+    (0.35, True),
+    (0.25, True),
+)
+
+
+def _encode_budget_png(image, scale, palette):
+    """按缩放比例和调色板设置重新编码已解码的PIL图片，返回PNG字节"""
+    from PIL import Image
+    if scale < 1:
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                             Image.LANCZOS)
+    if palette:
+        image = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+    buf = io.BytesIO()
+    image.save(buf, format='png', optimize=True)
+    return buf.getvalue()
+
+
+def fit_pptx_to_budget(data, max_bytes, deterministic=False, encodings=None):
+    """把pptx压缩到不超过max_bytes字节，返回(新的字节串, 报告)
+
+    所有部件改用最高的deflate级别（无损）；仍然超出时按IMAGE_BUDGET_STEPS逐档降低图片：
+    每次在降档后画质损失最小的图片中选择节省字节最多的一张，使各图片的画质尽量一致，
+    直到满足预算或所有图片都已降到最低档。
+    每张图片只解码一次，各档位的编码结果按内容哈希缓存在encodings中（可在多次调用间共享），
+    反复尝试时不会重复编码，也不需要重新渲染图形。
+    报告包含original、achieved（字节数）、fits、seconds、attempts（写出zip的次数）
+    和images（每张图片采用的档位，None表示保持原样）。
+    """
+    from PIL import Image
+    started = time.perf_counter()
+    encodings = {} if encodings is None else encodings
+    src = zipfile.ZipFile(io.BytesIO(data))
+    parts = {name: src.read(name) for name in src.namelist()}
+    src.close()
+    date = _deterministic_zip_date() if deterministic else time.localtime()[:6]
+    media = [name for name in parts if name.startswith('ppt/media/') and name.endswith('.png')]
+    originals = {name: parts[name] for name in media}
+    digests = {name: hashlib.sha1(originals[name]).hexdigest() for name in media}
+    levels = dict.fromkeys(media, -1)
+    decoded = {}
+    
+    def encoded(name, level):
+        if level < 0:
+            return originals[name]
+        key = (digests[name], level)
+        if key not in encodings:
+            if name not in decoded:
+                with Image.open(io.BytesIO(originals[name])) as image:
+                    image.load()
+                    decoded[name] = image.copy()
+            encodings[key] = _encode_budget_png(decoded[name], *IMAGE_BUDGET_STEPS[level])
+        return encodings[key]
+    
+    def next_level(name):
+        """比当前档位更小的下一档（跳过编码后反而更大的档位），没有时返回None"""
+        current = len(encoded(name, levels[name]))
+        for level in range(levels[name] + 1, len(IMAGE_BUDGET_STEPS)):
+            if len(encoded(name, level)) < current:
+                return level
+        return None
+    
+    result = _zip_parts(parts, date, compresslevel=9)
+    attempts = 1
+    estimate = len(result)
+    pending = False  # parts中有尚未写出的降档图片
+    while len(result) > max_bytes:
+        best = None
+        for name in media:
+            level = next_level(name)
+            if level is not None:
+                saving = len(encoded(name, levels[name])) - len(encoded(name, level))
+                if best is None or (level, -saving) < (best[1], -best[2]):
+                    best = (name, level, saving)
+        if best is None:
+            break
+        name, levels[name], saving = best
+        parts[name] = encoded(name, levels[name])
+        pending = True
+        # PNG在zip中几乎不再压缩，按节省的字节估算，估计满足预算时才实际写出
+        estimate -= saving
+        if estimate <= max_bytes:
+            result = _zip_parts(parts, date, compresslevel=9)
+            attempts += 1
+            estimate = len(result)
+            pending = False
+    if pending:
+        # 无法满足预算时也写出最终状态，使result、achieved与images描述的是同一份文件
+        result = _zip_parts(parts, date, compresslevel=9)
+        attempts += 1
+    
+    report = {
+        'budget': max_bytes,
+        'original': len(data),
+        'achieved': len(result),
+        'fits': len(result) <= max_bytes,
+        'seconds': time.perf_counter() - started,
+        'attempts': attempts,
+        'images': {name: None if level < 0 else IMAGE_BUDGET_STEPS[level] for name, level in levels.items()},
+    }
+    return result, report
+
+# 纯文字幻灯片（标题和内容布局）的形状树模板，与python-pptx对象模型生成的XML逐字节一致
+_TEXT_SLIDE_TEMPLATE = (
+    '<p:spTree %s><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+    '<p:grpSpPr/>'
+    '<p:sp><p:nvSpPr><p:cNvPr id="2" name="Title 1"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+    '<p:nvPr><p:ph type="title"/></p:nvPr></p:nvSpPr><p:spPr/>'
+    '<p:txBody><a:bodyPr/><a:lstStyle/>{title}</p:txBody></p:sp>'
+    '<p:sp><p:nvSpPr><p:cNvPr id="3" name="Content Placeholder 2"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+    '<p:nvPr><p:ph idx="1"/></p:nvPr></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:ext cx="{width}" cy="0"/></a:xfrm></p:spPr>'
+    '<p:txBody><a:bodyPr/><a:lstStyle/><a:p/>{items}</p:txBody></p:sp>'
+    '</p:spTree>'
+) % nsdecls('p', 'a', 'r')
+_TEXT_TITLE_PPR = ('<a:pPr><a:defRPr sz="{size}" b="1"><a:solidFill><a:srgbClr val="{color}"/>'
+                   '</a:solidFill></a:defRPr></a:pPr>')
+_TEXT_ITEM_PPR = '<a:pPr><a:spcAft><a:spcPts val="{space}"/></a:spcAft><a:defRPr sz="{size}"/></a:pPr>'
+
+
+def _ooxml_runs(text):
+    """把一段文字转换为a:r/a:br序列，换行规则和控制字符转义与python-pptx相同"""
+    parts = []
+    for i, run in enumerate(re.split('\n|\v', text)):
+        if i:
+            parts.append('<a:br/>')
+        if run:
+            run = re.sub('([\x00-\x08\x0B-\x1F])', lambda m: '_x%04X_' % ord(m.group(1)), run)
+            parts.append(f'<a:r><a:t>{xml_escape(run)}</a:t></a:r>')
+    return ''.join(parts)
+
+
+# 幻灯片注册表：(方法名, 所属章节, 依赖的幻灯片)，顺序即默认构建顺序
+SLIDE_REGISTRY = (
+    ('create_cover_slide', 'frame', ()),
+    ('create_table_of_contents', 'frame', ('create_cover_slide',)),
+    ('create_basic_concepts_slide', 'basics', ()),
+    ('create_parallelogram_intro', 'parallelogram', ()),
+    ('create_parallelogram_properties', 'parallelogram', ('create_parallelogram_intro',)),
+    ('create_parallelogram_theorems', 'parallelogram', ('create_parallelogram_properties',)),
+    ('create_special_parallelogram_relationship', 'special', ()),  # 先介绍关系
+    ('create_rectangle_slide', 'special', ('create_special_parallelogram_relationship',)),
+    ('create_rhombus_slide', 'special', ('create_rectangle_slide',)),
+    ('create_square_slide', 'special', ('create_rectangle_slide', 'create_rhombus_slide')),
+    ('create_trapezoid_intro', 'trapezoid', ()),
+    ('create_trapezoid_classification', 'trapezoid', ('create_trapezoid_intro',)),
+    ('create_trapezoid_properties', 'trapezoid', ('create_trapezoid_classification',)),
+    ('create_summary_slide', 'review', ()),
+    ('create_exercises_slide', 'review', ()),
+)
+
+# 整套PPT的默认构建顺序
+DEFAULT_SLIDES = tuple(name for name, _, _ in SLIDE_REGISTRY)
+
+# 章节开始构建时打印的进度信息
+SECTION_MESSAGES = {
+    'parallelogram': "创建平行四边形章节...",
+    'special': "创建特殊平行四边形章节...",
+    'trapezoid': "创建梯形章节...",
+    'review': "创建总结和练习题...",
+}
+
+# 图形库：图形名 -> (绘图方法, 说明)。绘图方法只在请求该图形时才调用
+DIAGRAM_LIBRARY = {
+    'quadrilateral': ('_draw_quadrilateral', "四边形ABCD"),
+    'parallelogram': ('_draw_parallelogram', "平行四边形ABCD"),
+    'parallelogram_diagonals': ('_draw_parallelogram_diagonals', "平行四边形及对角线交点O"),
+    'rectangle': ('_draw_rectangle', "矩形及对角线"),
+    'rhombus': ('_draw_rhombus', "菱形及互相垂直的对角线"),
+    'square': ('_draw_square', "正方形及对角线"),
+    'trapezoid': ('_draw_trapezoid', "梯形及高"),
+    'isosceles_trapezoid': ('_draw_isosceles_trapezoid', "等腰梯形"),
+    'right_trapezoid': ('_draw_right_trapezoid', "直角梯形"),
+    'trapezoid_classification_set': ('_draw_trapezoid_classification_set', "一般梯形、等腰梯形、直角梯形并列"),
+    'quadrilateral_relationships': ('_draw_quadrilateral_relationships', "四边形、平行四边形、特殊平行四边形和梯形的包含关系"),
+}
+
+# 目录条目：(章节, 对应幻灯片或None, 标题)，编号在生成目录时按实际内容重新计算
+TOC_ITEMS = (
+    ('basics', None, "四边形的基本概念"),
+    ('parallelogram', None, "平行四边形"),
+    ('special', None, "特殊的平行四边形"),
+    ('special', 'create_rectangle_slide', "矩形"),
+    ('special', 'create_rhombus_slide', "菱形"),
+    ('special', 'create_square_slide', "正方形"),
+    ('trapezoid', None, "梯形"),
+    ('review', None, "总结与练习"),
+)
+
+CHINESE_NUMERALS = "一二三四五六七八九十"
+
+# 只有标题和要点列表的幻灯片，fast_text模式下直接由OOXML模板生成
+TEXT_SLIDES = (
+    'create_parallelogram_theorems',
+    'create_special_parallelogram_relationship',
+    'create_summary_slide',
+)
+
+
+def resolve_slides(slides=None, sections=None, include_frame=True, with_dependencies=False):
+    """按方法名和/或章节选择幻灯片，返回按依赖关系排好序的方法名元组
+
+    slides和sections都为None时返回整套PPT。include_frame为True时总是包含封面和目录；
+    with_dependencies为True时自动补上所选幻灯片依赖的前置幻灯片。
+    """
+    registry = {name: (section, deps) for name, section, deps in SLIDE_REGISTRY}
+    if slides is None and sections is None:
+        return DEFAULT_SLIDES
+    
+    selected = set()
+    for name in slides or ():
+        if name not in registry:
+            raise ValueError(f"未知的幻灯片: {name}")
+        selected.add(name)
+    known_sections = {section for section, _ in registry.values()}
+    for section in sections or ():
+        if section not in known_sections:
+            raise ValueError(f"未知的章节: {section}")
+        selected.update(name for name, (sec, _) in registry.items() if sec == section)
+    if include_frame:
+        selected.update(name for name, (sec, _) in registry.items() if sec == 'frame')
+    if with_dependencies:
+        pending = list(selected)
+        while pending:
+            for dep in registry[pending.pop()][1]:
+                if dep not in selected:
+                    selected.add(dep)
+                    pending.append(dep)
+    
+    # 拓扑排序：只考虑已选中的依赖，同层按注册表顺序
+    order = []
+    done = set()
+    
+    def visit(name):
+        if name in done:
+            return
+        done.add(name)
+        for dep in registry[name][1]:
+            if dep in selected:
+                visit(dep)
+        order.append(name)
+    
+    for name in DEFAULT_SLIDES:
+        if name in selected:
+            visit(name)
+    return tuple(order)
+
+
 class QuadrilateralsPPTGenerator:
     """四边形PPT生成器类"""
     
-    def __init__(self, output_file="四边形.pptx"):
-        """初始化PPT生成器"""
-        self.prs = Presentation()
+    def __init__(self, output_file="四边形.pptx", deterministic=False, renderer='raster', dpi=300,
+                 build_steps=False, locale=SOURCE_LOCALE, diagram_cache=None, diagram_library=None,
+                 fast_text=False, thread_safe=False, answer_key=False, asset_pack=None):
+        """初始化PPT生成器
+
+        deterministic为True时启用确定性构建：相同输入生成逐字节相同的文件，
+        可直接用输出的哈希值作为缓存键。
+        renderer选择图形渲染方式（见RENDERERS），dpi为位图分辨率。
+        build_steps为True时，图形中标记了演示步骤的元素会按单击逐步出现。
+        locale为幻灯片文字的语言（见LOCALES）。diagram_cache为可在多个生成器间共享的
+        字典，用于复用渲染好的位图（例如同时生成多种语言时）。
+        diagram_library为DiagramLibrary，设置后位图直接取自图形库的缓存。
+        fast_text为True时纯文字幻灯片直接由OOXML模板生成，输出与对象模型方式相同。
+        thread_safe为True时不经过pyplot，图形用面向对象的Figure API创建，
+        多个生成器可以在不同线程中同时构建（输出相同）。
+        answer_key为True时在练习题之后为每道题生成一张解答幻灯片。
+        asset_pack为AssetPack，设置后模板和资源包中已有的位图直接引用共享的内存映射。
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(f"未知的渲染方式: {renderer}")
+        self.asset_pack = asset_pack
+        self.prs = self._new_presentation()
         self.output_file = output_file
+        self.deterministic = deterministic
+        self.renderer = renderer
+        self.dpi = dpi
+        self.build_steps = build_steps
+        self.locale = locale
+        self.catalog = load_catalog(locale)
+        self.diagram_cache = diagram_cache
+        self.diagram_library = diagram_library
+        self.fast_text = fast_text
+        self.thread_safe = thread_safe
+        self.answer_key = answer_key
+        # 已插入的图形数量，用于统计吞吐量
+        self.diagram_count = 0
         self.temp_images = []
+        self._temp_dir = None
+        # 当前构建包含的幻灯片，None表示整套（用于生成目录）
+        self.selected_slides = None
+        # 尚未关闭的matplotlib图形（正常情况下插入幻灯片后即关闭）
+        self._open_figures = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """释放本套PPT占用的临时文件和matplotlib图形"""
+        for fig in list(self._open_figures):
+            self._close_figure(fig)
+        self.cleanup_temp_images()
+    
+    def reset(self, output_file=None):
+        """释放当前这套PPT的全部状态并换成空白演示文稿，以便复用同一个生成器"""
+        self.close()
+        self.prs = self._new_presentation()
+        if output_file is not None:
+            self.output_file = output_file
+        self.diagram_count = 0
+        self.selected_slides = None
+    
+    def _new_presentation(self):
+        """空白演示文稿，设置了资源包时模板取自资源包"""
+        if self.asset_pack is None:
+            return Presentation()
+        return Presentation(self.asset_pack.template())
+    
+    def build(self, slides=None, progress=None):
+        """按顺序构建指定的幻灯片（默认整套），目录会随所选内容重新生成
+
+        progress为可选的回调，每进入一个新章节时以章节名调用一次。
+        """
+        slides = DEFAULT_SLIDES if slides is None else tuple(slides)
+        self.selected_slides = slides
+        sections = {name: section for name, section, _ in SLIDE_REGISTRY}
+        current = None
+        for name in slides:
+            if progress is not None and sections[name] != current:
+                progress(sections[name])
+            current = sections[name]
+            getattr(self, name)()
+    
+    def build_specs(self, specs):
+        """按内容表格解析出的幻灯片规格依次构建幻灯片（见parse_slide_specs）"""
+        self.selected_slides = ()
+        for spec in specs:
+            self.add_spec_slide(spec)
+    
+    def add_spec_slide(self, spec):
+        """按规格添加一张幻灯片：定义、性质、编号的练习题，有图形时放在右侧"""
+        slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
+        slide = self.prs.slides.add_slide(slide_layout)
+        
+        title = slide.shapes.title
+        title.text = self._(spec['title'])
+        title.text_frame.paragraphs[0].font.size = Pt(36)
+        title.text_frame.paragraphs[0].font.bold = True
+        title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 78, 152)
+        
+        content = slide.placeholders[1]
+        if spec['diagram']:
+            # 限制文本区域宽度，避免与图片重叠
+            content.width = Cm(12)
+        tf = content.text_frame
+        tf.clear()
+        
+        if spec['definition']:
+            p = tf.add_paragraph()
+            p.text = self._(spec['definition'])
+            p.font.size = Pt(18)
+            p.font.bold = True
+            p.space_after = Pt(12)
+        
+        for item in spec['properties']:
+            p = tf.add_paragraph()
+            p.text = self._(item)
+            p.font.size = Pt(16)
+            p.space_after = Pt(6)
+        
+        for i, exercise in enumerate(spec['exercises'], 1):
+            p = tf.add_paragraph()
+            p.text = f"{i}. {self._(exercise)}"
+            p.font.size = Pt(16)
+            p.space_after = Pt(12)
+        
+        if spec['diagram']:
+            self._add_diagram(slide, spec['diagram'])
+        return slide
+    
+    def _(self, text):
+        """翻译文字，目录中没有的消息原样返回"""
+        return self.catalog.get(text, text)
+    
+    def _figure_text(self, text):
+        """翻译图形中的文字，matplotlib只把\n当作换行"""
+        return self._(text).replace('\v', '\n')
     
     def create_cover_slide(self):
         """创建封面幻灯片"""
@@ -39,8 +593,8 @@ class QuadrilateralsPPTGenerator:
         title = slide.shapes.title
         subtitle = slide.placeholders[1]
         
-        title.text = "四边形"
-        subtitle.text = "8年级数学 - 人教版"
+        title.text = self._("四边形")
+        subtitle.text = self._("8年级数学 - 人教版")
         
         # 设置标题样式
         title.text_frame.paragraphs[0].font.size = Pt(54)
@@ -56,7 +610,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "目录"
+        title.text = self._("目录")
         title.text_frame.paragraphs[0].font.size = Pt(40)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 78, 152)
@@ -66,16 +620,7 @@ class QuadrilateralsPPTGenerator:
         tf = content.text_frame
         tf.clear()
         
-        items = [
-            "一、四边形的基本概念",
-            "二、平行四边形",
-            "三、特殊的平行四边形",
-            "   3.1 矩形",
-            "   3.2 菱形",
-            "   3.3 正方形",
-            "四、梯形",
-            "五、总结与练习"
-        ]
+        items = self._toc_items()
         
         for item in items:
             p = tf.add_paragraph()
@@ -88,6 +633,72 @@ class QuadrilateralsPPTGenerator:
             else:
                 p.level = 0
     
+    def _toc_items(self):
+        """根据当前构建的幻灯片生成目录条目，章节编号连续"""
+        selected = set(DEFAULT_SLIDES if self.selected_slides is None else self.selected_slides)
+        built_sections = {section for name, section, _ in SLIDE_REGISTRY if name in selected}
+        items = []
+        number = 0
+        sub_number = 0
+        for section, slide_name, text in TOC_ITEMS:
+            if section not in built_sections:
+                continue
+            if slide_name is None:
+                number += 1
+                sub_number = 0
+                if self.locale == 'en':
+                    items.append(f"{number}. {self._(text)}")
+                else:
+                    items.append(f"{CHINESE_NUMERALS[number - 1]}、{self._(text)}")
+            elif slide_name in selected:
+                sub_number += 1
+                items.append(f"   {number}.{sub_number} {self._(text)}")
+        return items
+    
+    def _add_text_slide(self, title_text, color, items, font_size, width=Cm(12), space_after=Pt(6)):
+        """添加标题加要点列表的纯文字幻灯片（标题和内容布局），标题和要点会先翻译
+
+        fast_text为True时由_TEXT_SLIDE_TEMPLATE直接生成形状树，
+        省去逐段落的对象模型操作，生成的XML与下面的对象模型方式相同。
+        """
+        slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
+        slide = self.prs.slides.add_slide(slide_layout)
+        if self.fast_text:
+            self._fill_text_slide_xml(slide, self._(title_text), color, [self._(item) for item in items],
+                                      font_size, width, space_after)
+            return slide
+        
+        title = slide.shapes.title
+        title.text = self._(title_text)
+        title.text_frame.paragraphs[0].font.size = Pt(36)
+        title.text_frame.paragraphs[0].font.bold = True
+        title.text_frame.paragraphs[0].font.color.rgb = color
+        
+        content = slide.placeholders[1]
+        # 限制文本区域宽度，避免与图片重叠
+        content.width = width
+        tf = content.text_frame
+        tf.clear()
+        
+        for item in items:
+            p = tf.add_paragraph()
+            p.text = self._(item)
+            p.font.size = font_size
+            p.space_after = space_after
+        return slide
+    
+    @staticmethod
+    def _fill_text_slide_xml(slide, title_text, color, items, font_size, width, space_after):
+        """用模板生成的形状树替换幻灯片从布局复制来的占位符"""
+        title = f'<a:p>{_TEXT_TITLE_PPR.format(size=3600, color=color)}{_ooxml_runs(title_text)}</a:p>'
+        ppr = _TEXT_ITEM_PPR.format(space=space_after.centipoints, size=font_size.centipoints)
+        body = ''.join(f'<a:p>{ppr}{_ooxml_runs(item)}</a:p>' for item in items)
+        tree = parse_xml(_TEXT_SLIDE_TEMPLATE.format(title=title, items=body, width=int(width)))
+        spTree = slide.shapes._spTree
+        for shape in list(spTree):
+            spTree.remove(shape)
+        spTree.extend(tree)
+    
     def _add_picture_to_slide(self, slide, img_path, width=Cm(8)):
         """统一的图片添加方法，确保图片位置合理，不与文本重叠"""
         # 将图片放在右侧，距离左侧14cm，顶部6cm，避免与文本区域重叠
@@ -95,13 +706,318 @@ class QuadrilateralsPPTGenerator:
         top = Cm(6)
         slide.shapes.add_picture(img_path, left, top, width=width)
     
+    def _add_packed_picture(self, slide, digest, blob, size, width=Cm(8)):
+        """把资源包中的PNG插入幻灯片，位置和尺寸与_add_picture_to_slide一致
+
+        图片部件直接持有映射区域的memoryview，保存时才写入zip；同一图片只添加一次。
+        尺寸使用资源包中记录的原始尺寸，不再解析PNG。
+        """
+        package = slide.part.package
+        image_part = next((part for part in package.iter_parts()
+                           if isinstance(part, ImagePart) and part.sha1 == digest), None)
+        if image_part is None:
+            image_part = ImagePart(package.next_image_partname('png'), 'image/png', package,
+                                   blob, f'{digest}.png')
+        rId = slide.part.relate_to(image_part, RT.IMAGE)
+        cx, cy = size
+        height = int(round(cy * (float(width) / float(cx))))
+        slide.shapes._add_pic_from_image_part(image_part, rId, Cm(14), Cm(6), width, height)
+    
+    def figure(self, name):
+        """按名称从图形库创建matplotlib图形（未渲染）"""
+        if name not in DIAGRAM_LIBRARY:
+            raise ValueError(f"未知的图形: {name}")
+        fig, ax = self._create_figure()
+        getattr(self, DIAGRAM_LIBRARY[name][0])(ax)
+        return fig
+    
+    def _add_diagram(self, slide, name, width=Cm(8)):
+        """把图形库中的图形插入幻灯片
+
+        设置了diagram_library且为普通位图时，直接使用图形库中预先渲染的PNG，不再绘图；
+        设置了asset_pack时优先使用资源包中的PNG。
+        """
+        plain = self.renderer == 'raster' and not self.build_steps and self.diagram_cache is None
+        packed = self.asset_pack.diagram(name, self.locale, self.dpi) if plain and self.asset_pack else None
+        if packed is not None:
+            self.diagram_count += 1
+            self._add_packed_picture(slide, *packed, width=width)
+            return
+        if self.diagram_library is not None and plain:
+            self.diagram_count += 1
+            png = self.diagram_library.get(name, locale=self.locale, dpi=self.dpi)
+            self._add_picture_to_slide(slide, self._store_temp_png(png), width=width)
+            return
+        self._add_figure_to_slide(slide, self.figure(name), width=width)
+    
+    def _add_figure_to_slide(self, slide, fig, width=Cm(8)):
+        """按当前渲染方式把matplotlib图形插入幻灯片，位置与_add_picture_to_slide一致"""
+        self.diagram_count += 1
+        left, top = Cm(14), Cm(6)
+        steps = self._collect_build_steps(fig) if self.build_steps else []
+        if self.renderer == 'native':
+            groups = self._add_native_figure(slide.shapes, fig, left, top, width, steps)
+            self._close_figure(fig)
+            self._add_appear_animations(slide, groups)
+        elif steps:
+            pictures = self._add_layered_pictures(slide, fig, left, top, width, steps)
+            self._add_appear_animations(slide, pictures)
+        elif self.diagram_cache is not None:
+            self._add_cached_figure(slide, fig, left, top, width)
+        else:
+            img_path = self._save_temp_image(fig)
+            self._add_picture_to_slide(slide, img_path, width=width)
+    
+    @staticmethod
+    def _mark_build_step(step, *artists):
+        """把图形元素标记为第step步出现（从1开始，未标记的元素属于底图）"""
+        for artist in artists:
+            artist.set_gid(f'build-step-{step}')
+    
+    @staticmethod
+    def _collect_build_steps(fig):
+        """按步骤顺序返回标记过的元素列表，每步一个列表"""
+        steps = {}
+        for artist in fig.axes[0].get_children():
+            gid = artist.get_gid()
+            if gid and gid.startswith('build-step-'):
+                steps.setdefault(int(gid[len('build-step-'):]), []).append(artist)
+        return [steps[k] for k in sorted(steps)]
+    
+    def _add_layered_pictures(self, slide, fig, left, top, width, steps):
+        """位图方式的逐步演示：底图和每一步各一张透明PNG，叠放在同一位置
+
+        底图完整绘制一次，之后每一步只在清空的画布上重绘该步的元素，
+        不重复绘制底图，N步演示的开销接近一次渲染。
+        """
+        canvas = self._agg_canvas(fig)
+        # 所有图层使用与bbox_inches='tight'相同的裁剪范围
+        crop = self._tight_crop(fig, canvas)
+        
+        step_artists = [artist for step in steps for artist in step]
+        for artist in step_artists:
+            artist.set_visible(False)
+        canvas.draw()
+        layers = [self._encode_layer(canvas, crop)]
+        for step in steps:
+            self._draw_only(canvas, step)
+            layers.append(self._encode_layer(canvas, crop))
+        self._close_figure(fig)
+        
+        pictures = []
+        for png in layers:
+            path = self._store_temp_png(png)
+            pictures.append(slide.shapes.add_picture(path, left, top, width=width))
+        return pictures[1:]
+    
+    def _agg_canvas(self, fig):
+        """为图形创建按self.dpi渲染的Agg画布"""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig.set_dpi(self.dpi)
+        return FigureCanvasAgg(fig)
+    
+    def _tight_crop(self, fig, canvas):
+        """按当前可见元素计算与bbox_inches='tight'相同的像素裁剪范围(x0, y0, x1, y1)"""
+        bbox = fig.get_tightbbox(canvas.get_renderer()).padded(0.1)
+        height_px = int(canvas.get_width_height()[1])
+        return (int(bbox.x0 * self.dpi), max(0, height_px - int(np.ceil(bbox.y1 * self.dpi))),
+                int(np.ceil(bbox.x1 * self.dpi)), height_px - int(bbox.y0 * self.dpi))
+    
+    @staticmethod
+    def _draw_only(canvas, artists):
+        """在清空（透明）的画布上只绘制指定元素"""
+        renderer = canvas.get_renderer()
+        renderer.clear()
+        for artist in artists:
+            artist.set_visible(True)
+            artist.draw(renderer)
+    
+    def _encode_layer(self, canvas, crop):
+        """裁剪画布当前内容并编码为PNG字节"""
+        import matplotlib.image as mimage
+        x0, y0, x1, y1 = crop
+        buf = io.BytesIO()
+        mimage.imsave(buf, np.asarray(canvas.buffer_rgba())[y0:y1, x0:x1], format='png', dpi=self.dpi,
+                      metadata={'Software': None} if self.deterministic else None)
+        return buf.getvalue()
+    
+    def _add_cached_figure(self, slide, fig, left, top, width):
+        """通过diagram_cache复用位图：相同指纹的图形只渲染一次
+
+        含有可翻译文字（gid='label'）的图形拆成底图和文字层两张叠放的PNG，
+        底图在各语言间共享，换语言时只重绘文字层。
+        """
+        ax = fig.axes[0]
+        labels = [text for text in ax.texts if text.get_gid() == 'label']
+        key = (_figure_fingerprint(fig, exclude=labels), self.dpi, self.deterministic)
+        entry = self.diagram_cache.get(key)
+        if not labels:
+            if entry is None:
+                buf = io.BytesIO()
+                fig.savefig(buf, format='png', dpi=self.dpi, bbox_inches='tight',
+                            metadata={'Software': None} if self.deterministic else None)
+                entry = self.diagram_cache[key] = (buf.getvalue(),)
+            self._close_figure(fig)
+            slide.shapes.add_picture(self._store_temp_png(entry[0]), left, top, width=width)
+            return
+        
+        canvas = self._agg_canvas(fig)
+        if entry is None:
+            for text in labels:
+                text.set_visible(False)
+            crop = self._tight_crop(fig, canvas)
+            canvas.draw()
+            entry = self.diagram_cache[key] = (self._encode_layer(canvas, crop), crop)
+        else:
+            ax.apply_aspect()  # 未完整绘制时也需要确定坐标变换
+        base, crop = entry
+        self._draw_only(canvas, labels)
+        label_layer = self._encode_layer(canvas, crop)
+        self._close_figure(fig)
+        for png in (base, label_layer):
+            slide.shapes.add_picture(self._store_temp_png(png), left, top, width=width)
+    
+    def _add_native_figure(self, shapes, fig, left, top, width, steps=()):
+        """把图形中的线、多边形和文字转换为PPT原生形状
+
+        只支持本文件用到的元素：ax.plot折线/标记点、Rectangle/Polygon和ax.text/annotate文字。
+        steps中每一步的元素放入单独的组合形状，返回这些组合形状。
+        """
+        ax = fig.axes[0]
+        ax.apply_aspect()
+        x0, x1 = ax.get_xlim()
+        y0, y1 = ax.get_ylim()
+        scale = width / (x1 - x0)  # 数据坐标 -> EMU
+        # 线宽、字号按位图方式的缩放比例换算
+        axes_width_inches = ax.get_position().width * fig.get_figwidth()
+        pt_scale = width / Inches(axes_width_inches)
+        
+        def to_emu(x, y):
+            return int(left + (x - x0) * scale), int(top + (y1 - y) * scale)
+        
+        def add_path(shapes, points, color, linewidth, linestyle='-', closed=False):
+            points = [to_emu(x, y) for x, y in points]
+            builder = shapes.build_freeform(*points[0])
+            builder.add_line_segments(points[1:], close=closed)
+            shape = builder.convert_to_shape()
+            shape.fill.background()
+            shape.line.color.rgb = RGBColor(*(round(c * 255) for c in mcolors.to_rgb(color)))
+            shape.line.width = Pt(linewidth * pt_scale)
+            if linestyle in ('--', 'dashed'):
+                shape.line.dash_style = MSO_LINE_DASH_STYLE.DASH
+            elif linestyle in (':', 'dotted'):
+                shape.line.dash_style = MSO_LINE_DASH_STYLE.ROUND_DOT
+            return shape
+        
+        def add_line(shapes, line):
+            points = list(zip(line.get_xdata(), line.get_ydata()))
+            color = line.get_color()
+            if line.get_linestyle() not in ('None', '') and len(points) > 1:
+                add_path(shapes, points, color, line.get_linewidth(), line.get_linestyle())
+            if line.get_marker() == 'o':
+                size = int(Pt(line.get_markersize() * pt_scale))
+                for x, y in points:
+                    cx, cy = to_emu(x, y)
+                    dot = shapes.add_shape(MSO_SHAPE.OVAL, cx - size // 2, cy - size // 2, size, size)
+                    dot.fill.solid()
+                    dot.fill.fore_color.rgb = RGBColor(*(round(c * 255) for c in mcolors.to_rgb(color)))
+                    dot.line.fill.background()
+        
+        def add_patch(shapes, patch):
+            verts = patch.get_patch_transform().transform(patch.get_path().vertices)
+            add_path(shapes, [tuple(v) for v in verts], patch.get_edgecolor(), patch.get_linewidth(), closed=True)
+        
+        def add_text(shapes, text):
+            x, y = text.get_position()
+            dx = dy = 0
+            if hasattr(text, 'xy'):  # annotate：文字位于锚点的偏移处
+                x, y = text.xy
+                if text.anncoords == 'offset points':
+                    dx, dy = text.xyann
+            font_size = text.get_fontsize() * pt_scale
+            cx, cy = to_emu(x, y)
+            cx += int(Pt(dx * pt_scale))
+            cy -= int(Pt(dy * pt_scale) + Pt(font_size))
+            box_width = int(Pt(font_size) * (len(text.get_text()) + 1))
+            if text.get_horizontalalignment() == 'center':
+                cx -= box_width // 2
+            box = shapes.add_textbox(cx, cy, box_width, int(Pt(font_size * 1.5)))
+            tf = box.text_frame
+            tf.margin_left = tf.margin_right = tf.margin_top = tf.margin_bottom = 0
+            p = tf.paragraphs[0]
+            p.text = text.get_text()
+            p.font.size = Pt(font_size)
+            p.font.color.rgb = RGBColor(*(round(c * 255) for c in mcolors.to_rgb(text.get_color())))
+            if text.get_horizontalalignment() == 'center':
+                p.alignment = PP_ALIGN.CENTER
+        
+        def draw(shapes, artists):
+            for line in ax.get_lines():
+                if line in artists:
+                    add_line(shapes, line)
+            for patch in ax.patches:
+                if patch in artists:
+                    add_patch(shapes, patch)
+            for text in ax.texts:
+                if text in artists:
+                    add_text(shapes, text)
+        
+        step_artists = {artist for step in steps for artist in step}
+        draw(shapes, [a for a in ax.get_children() if a not in step_artists])
+        groups = []
+        for step in steps:
+            group = shapes.add_group_shape()
+            draw(group.shapes, step)
+            # python-pptx只在add_shape/add_textbox时更新组合的范围，只含任意多边形的组合需手动更新
+            group.shapes._recalculate_extents()
+            groups.append(group)
+        return groups
+    
+    @staticmethod
+    def _add_appear_animations(slide, shapes):
+        """为形状添加"出现"进入动画，每个形状对应一次单击"""
+        if not shapes:
+            return
+        ids = iter(range(3, 3 + 4 * len(shapes)))
+        clicks = []
+        for shape in shapes:
+            click_id, group_id, effect_id, set_id = next(ids), next(ids), next(ids), next(ids)
+            clicks.append(
+                f'<p:par><p:cTn id="{click_id}" fill="hold"><p:stCondLst><p:cond delay="indefinite"/></p:stCondLst>'
+                f'<p:childTnLst><p:par><p:cTn id="{group_id}" fill="hold"><p:stCondLst><p:cond delay="0"/></p:stCondLst>'
+                f'<p:childTnLst><p:par><p:cTn id="{effect_id}" presetID="1" presetClass="entr" presetSubtype="0" '
+                f'fill="hold" nodeType="clickEffect"><p:stCondLst><p:cond delay="0"/></p:stCondLst>'
+                f'<p:childTnLst><p:set><p:cBhvr><p:cTn id="{set_id}" dur="1" fill="hold">'
+                f'<p:stCondLst><p:cond delay="0"/></p:stCondLst></p:cTn>'
+                f'<p:tgtEl><p:spTgt spid="{shape.shape_id}"/></p:tgtEl>'
+                f'<p:attrNameLst><p:attrName>style.visibility</p:attrName></p:attrNameLst></p:cBhvr>'
+                f'<p:to><p:strVal val="visible"/></p:to></p:set></p:childTnLst></p:cTn></p:par>'
+                f'</p:childTnLst></p:cTn></p:par></p:childTnLst></p:cTn></p:par>'
+            )
+        timing = parse_xml(
+            f'<p:timing {nsdecls("p")}><p:tnLst><p:par>'
+            '<p:cTn id="1" dur="indefinite" restart="never" nodeType="tmRoot"><p:childTnLst>'
+            '<p:seq concurrent="1" nextAc="seek"><p:cTn id="2" dur="indefinite" nodeType="mainSeq">'
+            f'<p:childTnLst>{"".join(clicks)}</p:childTnLst></p:cTn>'
+            '<p:prevCondLst><p:cond evt="onPrev" delay="0"><p:tgtEl><p:sldTgt/></p:tgtEl></p:cond></p:prevCondLst>'
+            '<p:nextCondLst><p:cond evt="onNext" delay="0"><p:tgtEl><p:sldTgt/></p:tgtEl></p:cond></p:nextCondLst>'
+            '</p:seq></p:childTnLst></p:cTn></p:par></p:tnLst></p:timing>'
+        )
+        # p:timing必须位于clrMapOvr/transition之后、extLst之前
+        sld = slide._element
+        anchor = sld.find(qn('p:extLst'))
+        if anchor is not None:
+            anchor.addprevious(timing)
+        else:
+            sld.append(timing)
+    
     def create_basic_concepts_slide(self):
         """创建四边形基本概念幻灯片"""
         slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "四边形的基本概念"
+        title.text = self._("四边形的基本概念")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 78, 152)
@@ -118,13 +1034,13 @@ class QuadrilateralsPPTGenerator:
         
         # 添加定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：由不在同一直线上的四条线段首尾顺次相接组成的封闭图形叫做四边形。"
+        p1.text = self._("定义：由不在同一直线上的四条线段首尾顺次相接组成的封闭图形叫做四边形。")
         p1.font.size = Pt(18)
         p1.line_spacing = 1.5
         
         # 添加构成要素
         p2 = tf.add_paragraph()
-        p2.text = "四边形的构成："
+        p2.text = self._("四边形的构成：")
         p2.font.size = Pt(20)
         p2.font.bold = True
         p2.space_after = Pt(12)
@@ -139,13 +1055,15 @@ class QuadrilateralsPPTGenerator:
         
         for element in elements:
             p = tf.add_paragraph()
-            p.text = element
+            p.text = self._(element)
             p.font.size = Pt(16)
             p.level = 1
             
         # 绘制一个简单的四边形图示
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'quadrilateral')
+    
+    def _draw_quadrilateral(self, ax):
+        """绘制一个简单的四边形图示"""
         # 绘制四边形
         x = [0, 2, 3, 1]
         y = [0, 0, 2, 2]
@@ -163,12 +1081,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 3.5)
         ax.set_ylim(-0.5, 2.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_parallelogram_intro(self):
         """创建平行四边形介绍幻灯片"""
@@ -176,7 +1088,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "平行四边形"
+        title.text = self._("平行四边形")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 128, 0)
@@ -190,25 +1102,27 @@ class QuadrilateralsPPTGenerator:
         
         # 定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：两组对边分别平行的四边形叫做平行四边形。"
+        p1.text = self._("定义：两组对边分别平行的四边形叫做平行四边形。")
         p1.font.size = Pt(18)
         p1.font.bold = True
         p1.space_after = Pt(12)
         
         # 平行四边形特点
         p2 = tf.add_paragraph()
-        p2.text = "平行四边形表示方法："
+        p2.text = self._("平行四边形表示方法：")
         p2.font.size = Pt(16)
         p2.space_after = Pt(6)
         
         p3 = tf.add_paragraph()
-        p3.text = "用符号□表示，例如：□ABCD"
+        p3.text = self._("用符号□表示，例如：□ABCD")
         p3.font.size = Pt(16)
         p3.level = 1
         
         # 绘制平行四边形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'parallelogram')
+    
+    def _draw_parallelogram(self, ax):
+        """绘制平行四边形"""
         # 绘制平行四边形
         x = [0, 3, 4, 1]
         y = [0, 0, 2, 2]
@@ -226,12 +1140,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 4.5)
         ax.set_ylim(-0.5, 2.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_parallelogram_properties(self):
         """创建平行四边形性质幻灯片"""
@@ -239,7 +1147,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "平行四边形的性质"
+        title.text = self._("平行四边形的性质")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 128, 0)
@@ -261,13 +1169,15 @@ class QuadrilateralsPPTGenerator:
         
         for prop in properties:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(18)
             p.space_after = Pt(6)
         
         # 绘制带有性质标注的平行四边形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'parallelogram_diagonals')
+    
+    def _draw_parallelogram_diagonals(self, ax):
+        """绘制带有性质标注的平行四边形"""
         # 绘制平行四边形
         x = [0, 4, 5, 1]
         y = [0, 0, 3, 3]
@@ -279,15 +1189,18 @@ class QuadrilateralsPPTGenerator:
             ax.annotate(label, (xi, yi), fontsize=14, 
                         xytext=(10, 10), textcoords='offset points')
         
-        # 绘制对角线
-        ax.plot([x[0], x[2]], [y[0], y[2]], 'r--', linewidth=1)  # AC对角线
-        ax.plot([x[1], x[3]], [y[1], y[3]], 'r--', linewidth=1)  # BD对角线
+        # 绘制对角线（逐步演示：先AC，再BD）
+        ac, = ax.plot([x[0], x[2]], [y[0], y[2]], 'r--', linewidth=1)  # AC对角线
+        bd, = ax.plot([x[1], x[3]], [y[1], y[3]], 'r--', linewidth=1)  # BD对角线
+        self._mark_build_step(1, ac)
+        self._mark_build_step(2, bd)
         
         # 标记对角线交点
         intersection = [(x[0]+x[2])/2, (y[0]+y[2])/2]
-        ax.plot(intersection[0], intersection[1], 'ro', markersize=6)
-        ax.annotate('O', intersection, fontsize=12, 
+        dot, = ax.plot(intersection[0], intersection[1], 'ro', markersize=6)
+        label_o = ax.annotate('O', intersection, fontsize=12, 
                    xytext=(10, -10), textcoords='offset points')
+        self._mark_build_step(3, dot, label_o)
         
         # 隐藏坐标轴
         ax.axis('off')
@@ -295,31 +1208,10 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-1, 6)
         ax.set_ylim(-1, 4)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_parallelogram_theorems(self):
         """创建平行四边形判定定理幻灯片"""
-        slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        title = slide.shapes.title
-        title.text = "平行四边形的判定"
-        title.text_frame.paragraphs[0].font.size = Pt(36)
-        title.text_frame.paragraphs[0].font.bold = True
-        title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 128, 0)
-        
-        # 添加判定定理
-        content = slide.placeholders[1]
-        # 限制文本区域宽度，避免与图片重叠
-        content.width = Cm(12)
-        tf = content.text_frame
-        tf.clear()
-        
+        # 判定定理
         theorems = [
             "1. 两组对边分别平行的四边形是平行四边形（定义）",
             "2. 两组对边分别相等的四边形是平行四边形",
@@ -328,11 +1220,7 @@ class QuadrilateralsPPTGenerator:
             "5. 两组对角分别相等的四边形是平行四边形"
         ]
         
-        for theorem in theorems:
-            p = tf.add_paragraph()
-            p.text = theorem
-            p.font.size = Pt(16)
-            p.space_after = Pt(6)
+        self._add_text_slide("平行四边形的判定", RGBColor(0, 128, 0), theorems, Pt(16))
     
     def create_rectangle_slide(self):
         """创建矩形幻灯片"""
@@ -340,7 +1228,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "特殊的平行四边形 - 矩形"
+        title.text = self._("特殊的平行四边形 - 矩形")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 140, 0)
@@ -354,14 +1242,14 @@ class QuadrilateralsPPTGenerator:
         
         # 定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：有一个角是直角的平行四边形叫做矩形（长方形）。"
+        p1.text = self._("定义：有一个角是直角的平行四边形叫做矩形（长方形）。")
         p1.font.size = Pt(18)
         p1.font.bold = True
         p1.space_after = Pt(12)
         
         # 矩形性质
         p2 = tf.add_paragraph()
-        p2.text = "矩形的性质："
+        p2.text = self._("矩形的性质：")
         p2.font.size = Pt(16)
         p2.font.bold = True
         p2.space_after = Pt(6)
@@ -375,13 +1263,15 @@ class QuadrilateralsPPTGenerator:
         
         for prop in properties:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制矩形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'rectangle')
+    
+    def _draw_rectangle(self, ax):
+        """绘制矩形"""
         # 绘制矩形（直角平行四边形）
         x = [0, 4, 4, 0]
         y = [0, 0, 3, 3]
@@ -406,12 +1296,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 4.5)
         ax.set_ylim(-0.5, 3.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_rhombus_slide(self):
         """创建菱形幻灯片"""
@@ -419,7 +1303,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "菱形"
+        title.text = self._("菱形")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(218, 165, 32)
@@ -433,14 +1317,14 @@ class QuadrilateralsPPTGenerator:
         
         # 定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：有一组邻边相等的平行四边形叫做菱形。"
+        p1.text = self._("定义：有一组邻边相等的平行四边形叫做菱形。")
         p1.font.size = Pt(18)
         p1.font.bold = True
         p1.space_after = Pt(12)
         
         # 菱形性质
         p2 = tf.add_paragraph()
-        p2.text = "菱形的性质："
+        p2.text = self._("菱形的性质：")
         p2.font.size = Pt(16)
         p2.font.bold = True
         p2.space_after = Pt(6)
@@ -455,13 +1339,15 @@ class QuadrilateralsPPTGenerator:
         
         for prop in properties:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制菱形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'rhombus')
+    
+    def _draw_rhombus(self, ax):
+        """绘制菱形"""
         # 绘制菱形（邻边相等的平行四边形）
         x = [1, 3, 1, -1]
         y = [0, 2, 4, 2]
@@ -473,14 +1359,16 @@ class QuadrilateralsPPTGenerator:
             ax.annotate(label, (xi, yi), fontsize=14, 
                         xytext=(10, 10), textcoords='offset points')
         
-        # 绘制对角线
-        ax.plot([x[0], x[2]], [y[0], y[2]], 'r--', linewidth=1)  # AC对角线
-        ax.plot([x[1], x[3]], [y[1], y[3]], 'r--', linewidth=1)  # BD对角线
+        # 绘制对角线（逐步演示：先两条对角线，再垂直符号）
+        diagonals = ax.plot([x[0], x[2]], [y[0], y[2]], 'r--', linewidth=1)  # AC对角线
+        diagonals += ax.plot([x[1], x[3]], [y[1], y[3]], 'r--', linewidth=1)  # BD对角线
+        self._mark_build_step(1, *diagonals)
         
         # 标记垂直符号
         mid_x, mid_y = (x[0]+x[2])/2, (y[0]+y[2])/2
-        ax.plot([mid_x-0.2, mid_x, mid_x+0.2], [mid_y-0.2, mid_y, mid_y+0.2], 'r-', linewidth=1)
-        ax.plot([mid_x+0.2, mid_x, mid_x-0.2], [mid_y-0.2, mid_y, mid_y+0.2], 'r-', linewidth=1)
+        marks = ax.plot([mid_x-0.2, mid_x, mid_x+0.2], [mid_y-0.2, mid_y, mid_y+0.2], 'r-', linewidth=1)
+        marks += ax.plot([mid_x+0.2, mid_x, mid_x-0.2], [mid_y-0.2, mid_y, mid_y+0.2], 'r-', linewidth=1)
+        self._mark_build_step(2, *marks)
         
         # 隐藏坐标轴
         ax.axis('off')
@@ -488,12 +1376,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-1.5, 3.5)
         ax.set_ylim(-0.5, 4.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_square_slide(self):
         """创建正方形幻灯片"""
@@ -501,7 +1383,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "特殊的平行四边形 - 正方形"
+        title.text = self._("特殊的平行四边形 - 正方形")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(139, 0, 0)
@@ -515,14 +1397,14 @@ class QuadrilateralsPPTGenerator:
         
         # 定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：有一组邻边相等并且有一个角是直角的平行四边形叫做正方形。"
+        p1.text = self._("定义：有一组邻边相等并且有一个角是直角的平行四边形叫做正方形。")
         p1.font.size = Pt(18)
         p1.font.bold = True
         p1.space_after = Pt(12)
         
         # 正方形性质
         p2 = tf.add_paragraph()
-        p2.text = "正方形的性质："
+        p2.text = self._("正方形的性质：")
         p2.font.size = Pt(16)
         p2.font.bold = True
         p2.space_after = Pt(6)
@@ -538,13 +1420,15 @@ class QuadrilateralsPPTGenerator:
         
         for prop in properties:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制正方形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'square')
+    
+    def _draw_square(self, ax):
+        """绘制正方形"""
         # 绘制正方形（四边相等且有直角的平行四边形）
         x = [0, 3, 3, 0]
         y = [0, 0, 3, 3]
@@ -574,31 +1458,9 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 3.5)
         ax.set_ylim(-0.5, 3.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_special_parallelogram_relationship(self):
         """创建特殊平行四边形关系幻灯片"""
-        slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        title = slide.shapes.title
-        title.text = "特殊平行四边形之间的关系"
-        title.text_frame.paragraphs[0].font.size = Pt(36)
-        title.text_frame.paragraphs[0].font.bold = True
-        title.text_frame.paragraphs[0].font.color.rgb = RGBColor(72, 61, 139)
-        
-        # 添加内容
-        content = slide.placeholders[1]
-        # 限制文本区域宽度，避免与图片重叠
-        content.width = Cm(12)
-        tf = content.text_frame
-        tf.clear()
-        
         relationships = [
             "1. 矩形、菱形、正方形都是特殊的平行四边形",
             "2. 正方形既是矩形，又是菱形",
@@ -606,11 +1468,7 @@ class QuadrilateralsPPTGenerator:
             "4. 平行四边形不一定是矩形、菱形或正方形"
         ]
         
-        for rel in relationships:
-            p = tf.add_paragraph()
-            p.text = rel
-            p.font.size = Pt(18)
-            p.space_after = Pt(6)
+        self._add_text_slide("特殊平行四边形之间的关系", RGBColor(72, 61, 139), relationships, Pt(18))
     
     def create_trapezoid_intro(self):
         """创建梯形定义幻灯片"""
@@ -618,7 +1476,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "梯形的定义"
+        title.text = self._("梯形的定义")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(46, 139, 87)
@@ -632,14 +1490,14 @@ class QuadrilateralsPPTGenerator:
         
         # 定义段落
         p1 = tf.add_paragraph()
-        p1.text = "定义：一组对边平行，另一组对边不平行的四边形叫做梯形。"
+        p1.text = self._("定义：一组对边平行，另一组对边不平行的四边形叫做梯形。")
         p1.font.size = Pt(18)
         p1.font.bold = True
         p1.space_after = Pt(12)
         
         # 梯形各部分名称
         p2 = tf.add_paragraph()
-        p2.text = "梯形的各部分名称："
+        p2.text = self._("梯形的各部分名称：")
         p2.font.size = Pt(16)
         p2.font.bold = True
         p2.space_after = Pt(6)
@@ -653,13 +1511,15 @@ class QuadrilateralsPPTGenerator:
         
         for part in parts:
             p = tf.add_paragraph()
-            p.text = part
+            p.text = self._(part)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制普通梯形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'trapezoid')
+    
+    def _draw_trapezoid(self, ax):
+        """绘制普通梯形"""
         # 绘制梯形
         x = [0, 4, 3, 1]
         y = [0, 0, 3, 3]
@@ -684,12 +1544,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 4.5)
         ax.set_ylim(-0.5, 3.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_trapezoid_classification(self):
         """创建梯形分类幻灯片"""
@@ -697,7 +1551,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "梯形的分类"
+        title.text = self._("梯形的分类")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(46, 139, 87)
@@ -711,7 +1565,7 @@ class QuadrilateralsPPTGenerator:
         
         # 分类介绍
         p1 = tf.add_paragraph()
-        p1.text = "梯形可分为以下几类："
+        p1.text = self._("梯形可分为以下几类：")
         p1.font.size = Pt(16)
         p1.font.bold = True
         p1.space_after = Pt(6)
@@ -725,13 +1579,15 @@ class QuadrilateralsPPTGenerator:
         
         for cls in classifications:
             p = tf.add_paragraph()
-            p.text = cls
+            p.text = self._(cls)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制等腰梯形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'isosceles_trapezoid')
+    
+    def _draw_isosceles_trapezoid(self, ax):
+        """绘制等腰梯形"""
         # 绘制等腰梯形（两腰相等）
         x = [0, 4, 3, 1]
         y = [0, 0, 3, 3]
@@ -753,12 +1609,6 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 4.5)
         ax.set_ylim(-0.5, 3.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
     def create_trapezoid_properties(self):
         """创建梯形性质幻灯片"""
@@ -766,7 +1616,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "梯形的性质"
+        title.text = self._("梯形的性质")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(46, 139, 87)
@@ -780,7 +1630,7 @@ class QuadrilateralsPPTGenerator:
         
         # 梯形一般性质
         p1 = tf.add_paragraph()
-        p1.text = "一般梯形的性质："
+        p1.text = self._("一般梯形的性质：")
         p1.font.size = Pt(16)
         p1.font.bold = True
         p1.space_after = Pt(6)
@@ -793,13 +1643,13 @@ class QuadrilateralsPPTGenerator:
         
         for prop in general_props:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(16)
             p.level = 1
         
         # 等腰梯形性质
         p2 = tf.add_paragraph()
-        p2.text = "等腰梯形的性质："
+        p2.text = self._("等腰梯形的性质：")
         p2.font.size = Pt(16)
         p2.font.bold = True
         p2.space_after = Pt(6)
@@ -813,13 +1663,15 @@ class QuadrilateralsPPTGenerator:
         
         for prop in isosceles_props:
             p = tf.add_paragraph()
-            p.text = prop
+            p.text = self._(prop)
             p.font.size = Pt(16)
             p.level = 1
         
         # 绘制直角梯形
-        fig, ax = self._create_figure()
-        
+        self._add_diagram(slide, 'right_trapezoid')
+    
+    def _draw_right_trapezoid(self, ax):
+        """绘制直角梯形"""
         # 绘制直角梯形（有一个角是直角）
         x = [0, 4, 4, 0]
         y = [0, 0, 3, 3]
@@ -841,31 +1693,30 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-0.5, 4.5)
         ax.set_ylim(-0.5, 3.5)
+    
+    def _draw_trapezoid_classification_set(self, ax):
+        """并列绘制一般梯形、等腰梯形和直角梯形（供其他章节复用）"""
+        shapes = [
+            ('一般梯形', [0, 4, 3, 0.5], [0, 0, 2, 2]),
+            ('等腰梯形', [5, 9, 8, 6], [0, 0, 2, 2]),
+            ('直角梯形', [10, 14, 12, 10], [0, 0, 2, 2]),
+        ]
+        for name, x, y in shapes:
+            ax.plot(x + [x[0]], y + [y[0]], 'green', linewidth=2)
+            ax.text(sum(x) / 4, -0.6, self._figure_text(name), fontsize=12, ha='center', gid='label')
+        
+        # 标记直角
+        ax.plot([10.5, 10.5, 10], [0, 0.5, 0.5], 'green', linewidth=1)
         
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
+        # 隐藏坐标轴
+        ax.axis('off')
         
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
+        # 设置图形范围
+        ax.set_xlim(-0.5, 14.5)
+        ax.set_ylim(-1, 2.5)
     
     def create_summary_slide(self):
         """创建总结幻灯片"""
-        slide_layout = self.prs.slide_layouts[1]  # 使用标题和内容布局
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        title = slide.shapes.title
-        title.text = "四边形知识总结"
-        title.text_frame.paragraphs[0].font.size = Pt(36)
-        title.text_frame.paragraphs[0].font.bold = True
-        title.text_frame.paragraphs[0].font.color.rgb = RGBColor(139, 0, 0)
-        
-        # 添加总结内容
-        content = slide.placeholders[1]
-        # 限制文本区域宽度，避免与图片重叠
-        content.width = Cm(12)
-        tf = content.text_frame
-        tf.clear()
-        
         # 总结要点
         summary_points = [
             "1. 四边形的基本概念：由不在同一直线上的四条线段首尾顺次连接而成的图形",
@@ -879,11 +1730,7 @@ class QuadrilateralsPPTGenerator:
             "   - 直角梯形：有一个角是直角的梯形"
         ]
         
-        for point in summary_points:
-            p = tf.add_paragraph()
-            p.text = point
-            p.font.size = Pt(16)
-            p.space_after = Pt(6)
+        self._add_text_slide("四边形知识总结", RGBColor(139, 0, 0), summary_points, Pt(16))
     
     def create_exercises_slide(self):
         """创建练习题幻灯片"""
@@ -891,7 +1738,7 @@ class QuadrilateralsPPTGenerator:
         slide = self.prs.slides.add_slide(slide_layout)
         
         title = slide.shapes.title
-        title.text = "练习题"
+        title.text = self._("练习题")
         title.text_frame.paragraphs[0].font.size = Pt(36)
         title.text_frame.paragraphs[0].font.bold = True
         title.text_frame.paragraphs[0].font.color.rgb = RGBColor(70, 130, 180)
@@ -901,47 +1748,180 @@ class QuadrilateralsPPTGenerator:
         tf = content.text_frame
         tf.clear()
         
-        # 练习题
-        exercises = [
-            "1. 平行四边形ABCD中，AB=6cm，BC=8cm，求平行四边形的周长。",
-            "2. 矩形的一条对角线长为10cm，一边长为6cm，求另一边长。",
-            "3. 菱形的对角线分别为8cm和6cm，求菱形的面积和边长。",
-            "4. 梯形的上底为5cm，下底为10cm，高为4cm，求梯形的面积。",
-            "5. 正方形的周长为24cm，求正方形的面积。"
-        ]
+        # 练习题（由EXERCISES中的题目参数生成）
+        exercises = self._solve_exercises()
         
-        for i, exercise in enumerate(exercises, 1):
+        for i, (_, _, (question, _, _)) in enumerate(exercises, 1):
             p = tf.add_paragraph()
-            p.text = exercise
+            p.text = f"{i}. {question}"
             p.font.size = Pt(16)
             p.space_after = Pt(12)
         
         # 绘制一个包含四边形关系的示意图
-        fig, ax = self._create_figure()
+        self._add_diagram(slide, 'quadrilateral_relationships')
         
+        if self.answer_key:
+            self._add_solution_slides(exercises)
+    
+    def _solve_exercises(self):
+        """求解EXERCISES中的题目，返回[(类型, 已知量和结果, (题目, 解题步骤, 答案))]"""
+        exercises = []
+        for kind, params in EXERCISES:
+            values = solve_exercises(kind, **params)
+            texts = format_exercises(kind, values, self._)[0]
+            exercises.append((kind, {name: array[0] for name, array in values.items()}, texts))
+        return exercises
+    
+    def _add_solution_slides(self, exercises):
+        """为每道练习题添加一张解答幻灯片：解题步骤和标注了已知量的图形"""
+        for i, (kind, values, (question, steps, answer)) in enumerate(exercises, 1):
+            slide = self.prs.slides.add_slide(self.prs.slide_layouts[1])
+            
+            title = slide.shapes.title
+            title.text = self._("第{n}题解答").format(n=i)
+            title.text_frame.paragraphs[0].font.size = Pt(32)
+            title.text_frame.paragraphs[0].font.bold = True
+            title.text_frame.paragraphs[0].font.color.rgb = RGBColor(70, 130, 180)
+            
+            content = slide.placeholders[1]
+            # 限制文本区域宽度，避免与图片重叠
+            content.width = Cm(12)
+            tf = content.text_frame
+            tf.clear()
+            
+            p = tf.add_paragraph()
+            p.text = question
+            p.font.size = Pt(16)
+            p.font.bold = True
+            p.space_after = Pt(12)
+            
+            for step in steps:
+                p = tf.add_paragraph()
+                p.text = step
+                p.font.size = Pt(16)
+                p.space_after = Pt(6)
+            
+            p = tf.add_paragraph()
+            p.text = answer
+            p.font.size = Pt(16)
+            p.font.bold = True
+            p.font.color.rgb = RGBColor(0, 128, 0)
+            
+            fig, ax = self._create_figure()
+            getattr(self, EXERCISE_KINDS[kind][5])(ax, values)
+            self._add_figure_to_slide(slide, fig)
+    
+    @staticmethod
+    def _label_length(ax, x, y, value, **kwargs):
+        """在(x, y)处标注线段长度，value为None时标注问号（待求量）"""
+        text = "?" if value is None else f"{_format_numbers(np.array([value]))[0]}cm"
+        ax.text(x, y, text, fontsize=13, color='red', **kwargs)
+    
+    @staticmethod
+    def _fit_exercise_axes(ax, x, y):
+        """隐藏坐标轴，按图形大小留出标注空间"""
+        ax.axis('off')
+        pad = 0.2 * max(max(x) - min(x), max(y) - min(y))
+        ax.set_xlim(min(x) - pad, max(x) + pad)
+        ax.set_ylim(min(y) - pad, max(y) + pad)
+    
+    def _draw_exercise_parallelogram(self, ax, values):
+        """练习题图：平行四边形，标注AB、BC"""
+        a, b = values['a'], values['b']
+        dx, dy = b / 2, b * np.sqrt(3) / 2  # 内角60°
+        x = [0, a, a + dx, dx]
+        y = [0, 0, dy, dy]
+        ax.plot(x + [x[0]], y + [y[0]], 'b-', linewidth=2)
+        for xi, yi, label in zip(x, y, 'ABCD'):
+            ax.annotate(label, (xi, yi), fontsize=14, xytext=(5, 5), textcoords='offset points')
+        self._label_length(ax, a / 2, 0, a, ha='center', va='top')
+        self._label_length(ax, a + dx / 2, dy / 2, b, ha='left', va='center')
+        self._fit_exercise_axes(ax, x, y)
+    
+    def _draw_exercise_rectangle(self, ax, values):
+        """练习题图：矩形及对角线AC，标注AB和AC，BC待求"""
+        a, b = values['a'], values['b']
+        x = [0, a, a, 0]
+        y = [0, 0, b, b]
+        ax.plot(x + [x[0]], y + [y[0]], 'orange', linewidth=2)
+        mark = 0.1 * min(a, b)
+        ax.plot([a - mark, a - mark, a], [0, mark, mark], 'orange', linewidth=1)
+        ax.plot([0, a], [0, b], 'r--', linewidth=1)
+        for xi, yi, label in zip(x, y, 'ABCD'):
+            ax.annotate(label, (xi, yi), fontsize=14, xytext=(5, 5), textcoords='offset points')
+        self._label_length(ax, a / 2, 0, a, ha='center', va='top')
+        self._label_length(ax, a, b / 2, None, ha='left', va='center')
+        self._label_length(ax, a / 2, b / 2, values['d'], ha='right', va='bottom')
+        self._fit_exercise_axes(ax, x, y)
+    
+    def _draw_exercise_rhombus(self, ax, values):
+        """练习题图：菱形及互相垂直的对角线，标注两条对角线，边长待求"""
+        h1, h2 = values['h1'], values['h2']
+        x = [-h1, 0, h1, 0]
+        y = [0, -h2, 0, h2]
+        ax.plot(x + [x[0]], y + [y[0]], 'purple', linewidth=2)
+        ax.plot([-h1, h1], [0, 0], 'r--', linewidth=1)
+        ax.plot([0, 0], [-h2, h2], 'r--', linewidth=1)
+        for xi, yi, label in zip(x, y, 'ABCD'):
+            ax.annotate(label, (xi, yi), fontsize=14, xytext=(5, 5), textcoords='offset points')
+        self._label_length(ax, h1 / 2, 0, values['d1'], ha='center', va='bottom')
+        self._label_length(ax, 0, h2 / 2, values['d2'], ha='left', va='center')
+        self._label_length(ax, -h1 / 2, -h2 / 2, None, ha='right', va='top')
+        self._fit_exercise_axes(ax, x, y)
+    
+    def _draw_exercise_trapezoid(self, ax, values):
+        """练习题图：梯形及高，标注上底、下底和高"""
+        a, b, h = values['a'], values['b'], values['h']
+        left = (b - a) / 2
+        x = [0, b, left + a, left]
+        y = [0, 0, h, h]
+        ax.plot(x + [x[0]], y + [y[0]], 'g-', linewidth=2)
+        ax.plot([left, left], [0, h], 'r--', linewidth=1)
+        for xi, yi, label in zip(x, y, 'ABCD'):
+            ax.annotate(label, (xi, yi), fontsize=14, xytext=(5, 5), textcoords='offset points')
+        self._label_length(ax, left + a / 2, h, a, ha='center', va='bottom')
+        self._label_length(ax, b / 2, 0, b, ha='center', va='top')
+        self._label_length(ax, left, h / 2, h, ha='left', va='center')
+        self._fit_exercise_axes(ax, x, y)
+    
+    def _draw_exercise_square(self, ax, values):
+        """练习题图：正方形，标注周长，边长待求"""
+        a = values['a']
+        x = [0, a, a, 0]
+        y = [0, 0, a, a]
+        ax.plot(x + [x[0]], y + [y[0]], 'r-', linewidth=2)
+        for xi, yi, label in zip(x, y, 'ABCD'):
+            ax.annotate(label, (xi, yi), fontsize=14, xytext=(5, 5), textcoords='offset points')
+        self._label_length(ax, a / 2, 0, None, ha='center', va='top')
+        ax.text(a / 2, a / 2, self._figure_text("周长{p}cm").format(p=_format_numbers(np.array([values['p']]))[0]),
+                fontsize=13, ha='center', va='center', gid='label')
+        self._fit_exercise_axes(ax, x, y)
+    
+    def _draw_quadrilateral_relationships(self, ax):
+        """绘制一个包含四边形关系的示意图"""
         # 绘制四边形的包含关系
         ax.add_patch(plt.Rectangle((-2, -2), 8, 8, fill=False, edgecolor='black', linewidth=2))
-        ax.text(2, 5, '四边形', fontsize=16, ha='center')
+        ax.text(2, 5, self._figure_text('四边形'), fontsize=16, ha='center', gid='label')
         
         # 平行四边形
         ax.add_patch(plt.Rectangle((-1, -1), 3, 4, fill=False, edgecolor='green', linewidth=2))
-        ax.text(0.5, 3, '平行四边形', fontsize=14, ha='center', color='green')
+        ax.text(0.5, 3, self._figure_text('平行四边形'), fontsize=14, ha='center', color='green', gid='label')
         
         # 梯形
         ax.add_patch(plt.Polygon([[3, -1], [6, -1], [5, 1], [2, 3]], fill=False, edgecolor='orange', linewidth=2))
-        ax.text(4, 0.5, '梯形', fontsize=14, ha='center', color='orange')
+        ax.text(4, 0.5, self._figure_text('梯形'), fontsize=14, ha='center', color='orange', gid='label')
         
         # 矩形
         ax.add_patch(plt.Rectangle((-0.5, 0.5), 2, 2, fill=False, edgecolor='blue', linewidth=2))
-        ax.text(0.5, 2, '矩形', fontsize=12, ha='center', color='blue')
+        ax.text(0.5, 2, self._figure_text('矩形'), fontsize=12, ha='center', color='blue', gid='label')
         
         # 菱形
         ax.add_patch(plt.Polygon([[0, -0.5], [1, 0.5], [0, 1.5], [-1, 0.5]], fill=False, edgecolor='purple', linewidth=2))
-        ax.text(0, 0.5, '菱形', fontsize=12, ha='center', color='purple')
+        ax.text(0, 0.5, self._figure_text('菱形'), fontsize=12, ha='center', color='purple', gid='label')
         
         # 正方形
         ax.add_patch(plt.Rectangle([0, 0.5], 1, 1, fill=False, edgecolor='red', linewidth=2))
-        ax.text(0.5, 1.2, '正方形', fontsize=10, ha='center', color='red')
+        ax.text(0.5, 1.2, self._figure_text('正方形'), fontsize=10, ha='center', color='red', gid='label')
         
         # 隐藏坐标轴
         ax.axis('off')
@@ -949,82 +1929,1734 @@ class QuadrilateralsPPTGenerator:
         # 设置图形范围
         ax.set_xlim(-2.5, 6.5)
         ax.set_ylim(-2.5, 6.5)
-        
-        # 保存临时图片
-        img_path = self._save_temp_image(fig)
-        
-        # 使用统一方法在幻灯片中插入图片
-        self._add_picture_to_slide(slide, img_path)
     
-    def save(self):
-        """保存PPT文件"""
-        self.prs.save(self.output_file)
-        print(f"PPT已保存到: {self.output_file}")
-        
-        # 清理临时图片文件
+    def to_bytes(self):
+        """将PPT序列化为字节串，确定性模式下会规范化zip容器"""
+        buf = io.BytesIO()
+        self.prs.save(buf)
+        data = buf.getvalue()
+        if self.deterministic:
+            data = normalize_pptx_bytes(data)
+        return data
+    
+    def save(self, max_bytes=None):
+        """保存PPT文件
+
+        指定max_bytes时按体积预算压缩图片（见fit_pptx_to_budget），打印实际大小和用时并返回报告。
+        """
+        if max_bytes is not None:
+            data, report = fit_pptx_to_budget(self.to_bytes(), max_bytes, self.deterministic)
+            with open(self.output_file, 'wb') as f:
+                f.write(data)
+            print(f"PPT已保存到: {self.output_file} ({report['achieved']}字节，预算{max_bytes}字节，"
+                  f"{'满足' if report['fits'] else '未能满足'}，用时{report['seconds']:.2f}s)")
+            self.cleanup_temp_images()
+            return report
+        if self.deterministic:
+            data = self.to_bytes()
+            with open(self.output_file, 'wb') as f:
+                f.write(data)
+            print(f"PPT已保存到: {self.output_file} (sha256: {hashlib.sha256(data).hexdigest()})")
+        else:
+            self.prs.save(self.output_file)
+            print(f"PPT已保存到: {self.output_file}")
+        
+        self.cleanup_temp_images()
+    
+    def cleanup_temp_images(self):
+        """清理临时图片文件"""
         for img_path in self.temp_images:
             try:
                 os.remove(img_path)
             except:
                 pass
+        self.temp_images = []
+        if self._temp_dir:
+            try:
+                os.rmdir(self._temp_dir)
+            except OSError:
+                pass
+            self._temp_dir = None
     
     def _create_figure(self, title=None):
-        """创建一个matplotlib图形"""
-        fig, ax = plt.subplots(figsize=(8, 6))
+        """创建一个matplotlib图形
+
+        thread_safe模式下直接创建Figure并绑定Agg画布，不注册到pyplot的全局图形管理器。
+        """
+        if self.thread_safe:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=(8, 6))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+        else:
+            fig, ax = plt.subplots(figsize=(8, 6))
         ax.set_aspect('equal')
         if title:
             ax.set_title(title, fontsize=16)
+        self._open_figures.append(fig)
         return fig, ax
     
+    def _close_figure(self, fig):
+        """关闭图形；thread_safe模式下的图形不在pyplot中，释放引用即可"""
+        if fig in self._open_figures:
+            self._open_figures.remove(fig)
+        if not self.thread_safe:
+            plt.close(fig)
+    
     def _save_temp_image(self, fig):
         """保存临时图片并返回路径"""
+        if self.deterministic:
+            return self._save_content_named_image(fig)
         fd, path = tempfile.mkstemp(suffix='.png')
         os.close(fd)
-        fig.savefig(path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
+        fig.savefig(path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure(fig)
         self.temp_images.append(path)
         return path
+    
+    def _save_content_named_image(self, fig):
+        """确定性模式：去掉PNG元数据，按内容哈希命名图片
+
+        python-pptx会把图片文件名写入幻灯片XML（descr属性），
+        随机的临时文件名会导致每次输出不同。
+        """
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=self.dpi, bbox_inches='tight',
+                    metadata={'Software': None})
+        self._close_figure(fig)
+        return self._store_temp_png(buf.getvalue())
+    
+    def _store_temp_png(self, data):
+        """把PNG字节写入临时文件并返回路径，确定性模式下按内容哈希命名"""
+        if not self.deterministic:
+            fd, path = tempfile.mkstemp(suffix='.png')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self.temp_images.append(path)
+            return path
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='quadrilaterals_')
+        path = os.path.join(self._temp_dir, hashlib.sha1(data).hexdigest() + '.png')
+        if path not in self.temp_images:
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.temp_images.append(path)
+        return path
+
+def _library_versions():
+    """影响输出字节的库版本"""
+    import matplotlib
+    import pptx
+    return {
+        'python': platform.python_version(),
+        'python-pptx': pptx.__version__,
+        'matplotlib': matplotlib.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def _source_fingerprint():
+    """本模块源码的哈希：幻灯片文字、配色和练习题参数都写在代码里"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _catalog_fingerprint():
+    """全部字符串目录源文件的哈希"""
+    digest = hashlib.sha256()
+    if os.path.isdir(LOCALE_DIR):
+        for name in sorted(os.listdir(LOCALE_DIR)):
+            if name.endswith('.json'):
+                with open(os.path.join(LOCALE_DIR, name), 'rb') as f:
+                    digest.update(name.encode('utf-8') + f.read())
+    return digest.hexdigest()
+
+
+def deck_spec(slides=DEFAULT_SLIDES, content=None, **options):
+    """描述一套PPT的完整输入，用于计算缓存键；content为内容表格解析出的幻灯片规格"""
+    spec = {
+        'slides': list(slides),
+        'options': options,
+        'source': _source_fingerprint(),
+        'catalogs': _catalog_fingerprint(),
+        'versions': _library_versions(),
+    }
+    if content is not None:
+        spec['content'] = content
+    return spec
+
+
+def deck_cache_key(spec):
+    """对输入描述做规范化JSON序列化后取sha256"""
+    payload = json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class DeckCache:
+    """整套PPT结果缓存，基于本地SQLite文件，支持TTL和按总大小淘汰
+
+    多个进程可以共用同一个缓存目录。
+    """
+    
+    def __init__(self, cache_dir, ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        """ttl为条目有效期（秒，None表示不过期），max_bytes为缓存总大小上限"""
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'decks.sqlite3')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS decks ('
+                'key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS decks_accessed ON decks (accessed)')
+    
+    def _connect(self):
+        """每次操作单独连接，避免跨线程共享连接"""
+        return sqlite3.connect(self.path, timeout=30)
+    
+    def get(self, key):
+        """命中时返回PPT字节串，否则返回None"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT data, created FROM decks WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute('DELETE FROM decks WHERE key = ?', (key,))
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute('UPDATE decks SET accessed = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return bytes(row[0])
+    
+    def put(self, key, data):
+        """写入一套PPT，并按TTL和总大小淘汰旧条目"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO decks (key, data, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, sqlite3.Binary(data), len(data), now, now),
+            )
+            self._evict(conn, now)
+    
+    def _evict(self, conn, now):
+        """先删除过期条目，再按最近访问时间淘汰直到不超过大小上限"""
+        if self.ttl is not None:
+            cur = conn.execute('DELETE FROM decks WHERE created < ?', (now - self.ttl,))
+            self.evictions += cur.rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM decks').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute('SELECT key, size FROM decks ORDER BY accessed').fetchall():
+            conn.execute('DELETE FROM decks WHERE key = ?', (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    def stats(self):
+        """命中/未命中统计及当前缓存占用"""
+        with self._connect() as conn:
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM decks').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+        }
+
+
+class DiagramLibrary:
+    """按名称提供预先渲染的图形（PNG字节），供本章和其他章节的PPT复用
+
+    图形按指纹缓存在内存和可选的磁盘目录中。指纹由图形名、本模块源码（包括绘图方法
+    调用的辅助方法）、语言目录、分辨率和库版本计算，不需要绘图即可判断缓存是否有效；
+    只有被请求且未命中缓存的图形才会绘制和渲染。可以在多个线程间共用。
+    """
+    
+    def __init__(self, cache_dir=None):
+        """cache_dir为磁盘缓存目录，None表示只在内存中缓存"""
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._memory = {}
+        self._generators = {}
+        self._fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def names():
+        """图形库中的全部图形名"""
+        return tuple(DIAGRAM_LIBRARY)
+    
+    def fingerprint(self, name, locale=SOURCE_LOCALE, dpi=300):
+        """图形规格的指纹"""
+        key = (name, locale, dpi)
+        if key not in self._fingerprints:
+            if name not in DIAGRAM_LIBRARY:
+                raise ValueError(f"未知的图形: {name}")
+            spec = {
+                'name': name,
+                'source': _source_fingerprint(),
+                'rc': [plt.rcParams['font.sans-serif'], plt.rcParams['axes.unicode_minus']],
+                'locale': locale,
+                'catalog': load_catalog(locale),
+                'dpi': dpi,
+                'versions': _library_versions(),
+            }
+            self._fingerprints[key] = deck_cache_key(spec)
+        return self._fingerprints[key]
+    
+    def get(self, name, locale=SOURCE_LOCALE, dpi=300):
+        """返回图形的PNG字节，未缓存时才绘制和渲染"""
+        fp = self.fingerprint(name, locale, dpi)
+        png = self._memory.get(fp)
+        path = os.path.join(self.cache_dir, fp + '.png') if self.cache_dir else None
+        if png is None and path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                png = f.read()
+        if png is not None:
+            self.hits += 1
+            self._memory[fp] = png
+            return png
+        
+        self.misses += 1
+        png = self._render(name, locale, dpi)
+        self._memory[fp] = png
+        if path:
+            # 先写临时文件再改名，多个进程或线程共用目录时不会读到不完整的文件
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(png)
+            os.replace(tmp, path)
+        return png
+    
+    def _render(self, name, locale, dpi):
+        """绘制并渲染图形，去掉PNG元数据以保证结果可复现"""
+        generator = self._generators.get(locale)
+        if generator is None:
+            generator = self._generators[locale] = QuadrilateralsPPTGenerator(locale=locale, thread_safe=True)
+        fig = generator.figure(name)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', metadata={'Software': None})
+        generator._close_figure(fig)
+        return buf.getvalue()
+
+
+# 共享资源包文件头：魔数 + 索引长度（小端8字节），之后是JSON索引和各段内容
+ASSET_PACK_MAGIC = b'QPACK\x00\x00\x01'
+
+
+def build_asset_pack(path, locales=(SOURCE_LOCALE,), dpis=(300,), names=None, library=None):
+    """把图形库中的图形（各语言、各分辨率）和演示文稿模板写入一个资源包文件，返回索引
+
+    内容按sha1去重（不含文字的图形在各语言间只存一份），偏移量相对于索引之后的数据区。
+    图形同时按指纹索引，代码或库版本变化后旧资源包中的图形不会再被使用。
+    """
+    from pptx.parts.image import Image
+    library = library or DiagramLibrary()
+    names = DIAGRAM_LIBRARY if names is None else names
+    blobs = {}
+    index = {'diagrams': {}, 'blobs': {}}
+    
+    def add(data, size=None):
+        digest = hashlib.sha1(data).hexdigest()
+        if digest not in blobs:
+            blobs[digest] = data
+            offset = sum(len(b) for b in blobs.values()) - len(data)
+            index['blobs'][digest] = {'offset': offset, 'length': len(data), 'size': size}
+        return digest
+    
+    template = os.path.join(os.path.dirname(inspect.getfile(Presentation)), 'templates', 'default.pptx')
+    with open(template, 'rb') as f:
+        index['template'] = add(f.read())
+    for locale in locales:
+        for dpi in dpis:
+            for name in names:
+                png = library.get(name, locale=locale, dpi=dpi)
+                # 与python-pptx相同的方法计算原始尺寸（EMU），插入时不必再解析PNG
+                image = Image.from_blob(png)
+                size = [int(914400 * px / res) for px, res in zip(image.size, image.dpi)]
+                index['diagrams'][library.fingerprint(name, locale, dpi)] = add(png, size)
+    
+    header = json.dumps(index, sort_keys=True).encode('utf-8')
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(ASSET_PACK_MAGIC + struct.pack('<Q', len(header)) + header)
+        for data in blobs.values():
+            f.write(data)
+    os.replace(tmp, path)
+    return index
+
+
+class AssetPack:
+    """只读内存映射的共享资源包（由build_asset_pack生成），按内容哈希（sha1）索引
+
+    多个工作进程映射同一个文件时共用操作系统的页缓存，每个进程不再各自渲染或读取
+    同样的图形和模板。取出的内容是指向映射区域的memoryview，插入幻灯片时也不复制，
+    直到写出zip时才被读取。
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != ASSET_PACK_MAGIC:
+            self._map.close()
+            raise ValueError(f"不是资源包文件: {path}")
+        length, = struct.unpack('<Q', self._map[8:16])
+        self.index = json.loads(self._map[16:16 + length].decode('utf-8'))
+        self._data = 16 + length
+        self._view = memoryview(self._map)
+        # 只用于计算图形指纹
+        self._library = DiagramLibrary()
+    
+    def blob(self, digest):
+        """按内容哈希返回映射区域中的memoryview"""
+        entry = self.index['blobs'][digest]
+        start = self._data + entry['offset']
+        return self._view[start:start + entry['length']]
+    
+    def template(self):
+        """演示文稿模板（python-pptx默认模板），只有几十KB，复制一份交给python-pptx读取"""
+        return io.BytesIO(self.blob(self.index['template']))
+    
+    def diagram(self, name, locale=SOURCE_LOCALE, dpi=300):
+        """返回(sha1, PNG的memoryview, 原始尺寸)，资源包中没有当前版本的该图形时返回None"""
+        digest = self.index['diagrams'].get(self._library.fingerprint(name, locale, dpi))
+        if digest is None:
+            return None
+        return digest, self.blob(digest), self.index['blobs'][digest]['size']
+
+
+def build_deck(slides=DEFAULT_SLIDES, cache=None, stats=None, progress=None, content=None, **options):
+    """生成一套PPT并返回字节串，命中缓存时直接返回已存储的结果
+
+    content为内容表格解析出的幻灯片规格列表，指定时按规格构建，忽略slides。
+    options会原样传给QuadrilateralsPPTGenerator，除output_file、diagram_cache、
+    diagram_library、asset_pack、fast_text和thread_safe（后三者不影响输出）外都计入缓存键；
+    diagram_cache会把含文字的图形拆成底图和文字层，只以是否指定计入缓存键。
+    使用缓存时固定启用确定性构建，保证同一缓存键对应同一份字节。
+    传入stats字典时会写入本次渲染的图形数量和是否命中缓存。
+    """
+    if stats is not None:
+        stats.update(diagrams=0, cached=False)
+    if cache is not None:
+        options['deterministic'] = True
+        key_options = {k: v for k, v in options.items()
+                       if k not in ('output_file', 'diagram_cache', 'diagram_library',
+                                    'asset_pack', 'fast_text', 'thread_safe')}
+        key_options['layered_labels'] = options.get('diagram_cache') is not None
+        key = deck_cache_key(deck_spec(slides, content, **key_options))
+        data = cache.get(key)
+        if data is not None:
+            if stats is not None:
+                stats['cached'] = True
+            return data
+    with QuadrilateralsPPTGenerator(**options) as ppt:
+        if content is not None:
+            ppt.build_specs(content)
+        else:
+            ppt.build(slides, progress=progress)
+        data = ppt.to_bytes()
+    if stats is not None:
+        stats['diagrams'] = ppt.diagram_count
+    if cache is not None:
+        cache.put(key, data)
+    return data
+
+
+def benchmark_text_slides(rounds=200, locale=SOURCE_LOCALE):
+    """比较纯文字幻灯片在对象模型和OOXML模板两种方式下的吞吐量
+
+    每种方式在同一个演示文稿中连续生成rounds轮TEXT_SLIDES，返回{方式: 张/秒}，
+    'equivalent'表示两种方式生成的幻灯片XML是否完全相同。
+    """
+    from lxml import etree
+    
+    result = {}
+    xml = {}
+    for mode, fast_text in (('object_model', False), ('fast_text', True)):
+        with QuadrilateralsPPTGenerator(locale=locale, fast_text=fast_text) as ppt:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for name in TEXT_SLIDES:
+                    getattr(ppt, name)()
+            elapsed = time.perf_counter() - started
+            xml[mode] = [etree.tostring(slide._element) for slide in ppt.prs.slides]
+        result[mode] = rounds * len(TEXT_SLIDES) / elapsed
+    result['equivalent'] = xml['object_model'] == xml['fast_text']
+    return result
+
+
+def benchmark_threads(decks=8, workers=(1, 2, 4), slides=DEFAULT_SLIDES, **options):
+    """多线程压力测试：用不同线程数各生成decks套PPT（thread_safe模式），返回{线程数: 套/秒}
+
+    默认使用确定性构建，'consistent'表示所有线程生成的字节是否完全相同。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    options.setdefault('deterministic', True)
+    options['thread_safe'] = True
+    result = {}
+    outputs = set()
+    for count in workers:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            outputs.update(hashlib.sha1(data).hexdigest() for data in
+                           pool.map(lambda _: build_deck(slides, **options), range(decks)))
+        result[count] = decks / (time.perf_counter() - started)
+    result['consistent'] = len(outputs) == 1 or not options['deterministic']
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 练习题：结构化的题目参数，按本章公式批量求解并生成解题步骤
+# ---------------------------------------------------------------------------
+
+def _solve_parallelogram_perimeter(a, b):
+    """周长 = 2(a+b)"""
+    return {'perimeter': 2 * (a + b)}
+
+
+def _solve_rectangle_side(d, a):
+    """勾股定理：另一边 = √(d²−a²)"""
+    diff = d ** 2 - a ** 2
+    return {'diff': diff, 'b': np.sqrt(np.where(diff > 0, diff, np.nan))}
+
+
+def _solve_rhombus_area_side(d1, d2):
+    """面积 = d1·d2/2，边长 = √((d1/2)²+(d2/2)²)"""
+    h1, h2 = d1 / 2, d2 / 2
+    total = h1 ** 2 + h2 ** 2
+    return {'area': d1 * d2 / 2, 'h1': h1, 'h2': h2, 'sum': total, 'side': np.sqrt(total)}
+
+
+def _solve_trapezoid_area(a, b, h):
+    """面积 = (a+b)h/2"""
+    return {'area': (a + b) * h / 2}
+
+
+def _solve_square_area(p):
+    """边长 = p/4，面积 = 边长²"""
+    side = p / 4
+    return {'a': side, 'area': side ** 2}
+
+
+# 练习题类型：类型 -> (求解函数, 参数名, 题目, 解题步骤, 答案, 图形绘制方法)
+# 题目、步骤和答案都是可翻译的模板，{名称}替换为已知量或求解结果
+EXERCISE_KINDS = {
+    'parallelogram_perimeter': (
+        _solve_parallelogram_perimeter, ('a', 'b'),
+        "平行四边形ABCD中，AB={a}cm，BC={b}cm，求平行四边形的周长。",
+        ("平行四边形的对边相等：CD=AB={a}cm，AD=BC={b}cm",
+         "周长 = 2(AB+BC) = 2×({a}+{b}) = {perimeter}cm"),
+        "答：平行四边形的周长为{perimeter}cm。",
+        '_draw_exercise_parallelogram',
+    ),
+    'rectangle_side': (
+        _solve_rectangle_side, ('d', 'a'),
+        "矩形的一条对角线长为{d}cm，一边长为{a}cm，求另一边长。",
+        ("矩形的四个角都是直角，两条邻边和对角线构成直角三角形",
+         "由勾股定理：另一边 = √({d}²−{a}²) = √{diff} {b_eq} {b}cm"),
+        "答：另一边长为{b}cm。",
+        '_draw_exercise_rectangle',
+    ),
+    'rhombus_area_side': (
+        _solve_rhombus_area_side, ('d1', 'd2'),
+        "菱形的对角线分别为{d1}cm和{d2}cm，求菱形的面积和边长。",
+        ("菱形的面积等于对角线乘积的一半：S = {d1}×{d2}÷2 = {area}cm²",
+         "菱形的对角线互相垂直平分，两条对角线的一半分别为{h1}cm和{h2}cm",
+         "由勾股定理：边长 = √({h1}²+{h2}²) = √{sum} {side_eq} {side}cm"),
+        "答：菱形的面积为{area}cm²，边长为{side}cm。",
+        '_draw_exercise_rhombus',
+    ),
+    'trapezoid_area': (
+        _solve_trapezoid_area, ('a', 'b', 'h'),
+        "梯形的上底为{a}cm，下底为{b}cm，高为{h}cm，求梯形的面积。",
+        ("梯形的面积 = (上底+下底)×高÷2",
+         "S = ({a}+{b})×{h}÷2 = {area}cm²"),
+        "答：梯形的面积为{area}cm²。",
+        '_draw_exercise_trapezoid',
+    ),
+    'square_area': (
+        _solve_square_area, ('p',),
+        "正方形的周长为{p}cm，求正方形的面积。",
+        ("正方形的四条边都相等：边长 = 周长÷4 = {p}÷4 = {a}cm",
+         "正方形的面积 = 边长² = {a}² = {area}cm²"),
+        "答：正方形的面积为{area}cm²。",
+        '_draw_exercise_square',
+    ),
+}
+
+# 练习题幻灯片中的题目：(类型, 已知量)，顺序即题号
+EXERCISES = (
+    ('parallelogram_perimeter', {'a': 6, 'b': 8}),
+    ('rectangle_side', {'d': 10, 'a': 6}),
+    ('rhombus_area_side', {'d1': 8, 'd2': 6}),
+    ('trapezoid_area', {'a': 5, 'b': 10, 'h': 4}),
+    ('square_area', {'p': 24}),
+)
+
+
+def solve_exercises(kind, **params):
+    """批量求解同一类型的练习题，返回{量名: 一维数组}（包含已知量）
+
+    参数可以是标量或等长数组，数组中的每个元素是一道题；整个批次用numpy一次算完。
+    已知量不是正数或题目无解（如对角线不长于边）时抛出ValueError。
+    """
+    if kind not in EXERCISE_KINDS:
+        raise ValueError(f"未知的练习题类型: {kind}")
+    solver, names = EXERCISE_KINDS[kind][:2]
+    if set(params) != set(names):
+        raise ValueError(f"{kind}需要参数: {', '.join(names)}")
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(params[name], dtype=float)) for name in names))
+    values = dict(zip(names, arrays))
+    values.update(solver(**values))
+    invalid = np.zeros(arrays[0].shape, dtype=bool)
+    for array in values.values():
+        invalid |= ~np.isfinite(array) | (array <= 0)
+    if invalid.any():
+        raise ValueError(f"{kind}的第{np.flatnonzero(invalid)[0] + 1}组参数无解")
+    return values
+
+
+def _format_numbers(array):
+    """数值转为题目中的写法：整数不带小数点，其余保留两位小数"""
+    rounded = np.round(array, 2)
+    return [str(int(x)) if x == int(x) else f"{x:.2f}".rstrip('0').rstrip('.') for x in rounded.tolist()]
+
+
+def format_exercises(kind, values, translate=None):
+    """把solve_exercises的结果格式化为[(题目, [解题步骤], 答案)]，每道题一项
+
+    translate为翻译函数（如生成器的_方法），模板只翻译一次后对整批题目复用。
+    """
+    _, names, question, steps, answer, _ = EXERCISE_KINDS[kind]
+    translate = translate or (lambda text: text)
+    question, answer = translate(question), translate(answer)
+    steps = [translate(step) for step in steps]
+    columns = {name: _format_numbers(array) for name, array in values.items()}
+    # 结果不是精确值（如开方）时用约等号
+    for name, array in values.items():
+        if name not in names:
+            columns[name + '_eq'] = np.where(np.abs(array - np.round(array, 2)) < 1e-9, '=', '≈').tolist()
+    texts = []
+    for row in zip(*columns.values()):
+        fields = dict(zip(columns, row))
+        texts.append((question.format(**fields), [step.format(**fields) for step in steps],
+                      answer.format(**fields)))
+    return texts
+
+
+def _pythagorean_triples(rng, count):
+    """随机生成count组整数勾股数(a, b, c)，a²+b²=c²"""
+    m = rng.integers(2, 6, count)
+    n = np.floor(rng.random(count) * (m - 1)).astype(int) + 1
+    k = rng.integers(1, 4, count)
+    return k * (m ** 2 - n ** 2), k * 2 * m * n, k * (m ** 2 + n ** 2)
+
+
+def exercise_variants(kind, count, seed=0):
+    """随机生成count道同类型练习题的已知量（答案都是整数），返回{参数名: 数组}"""
+    rng = np.random.default_rng(seed)
+    if kind == 'parallelogram_perimeter':
+        return {'a': rng.integers(2, 20, count), 'b': rng.integers(2, 20, count)}
+    if kind == 'rectangle_side':
+        a, b, c = _pythagorean_triples(rng, count)
+        return {'d': c, 'a': np.where(rng.random(count) < 0.5, a, b)}
+    if kind == 'rhombus_area_side':
+        a, b, _ = _pythagorean_triples(rng, count)
+        return {'d1': 2 * a, 'd2': 2 * b}
+    if kind == 'trapezoid_area':
+        a = rng.integers(2, 10, count)
+        h = rng.integers(1, 6, count) * 2  # 高取偶数，面积为整数
+        return {'a': a, 'b': a + rng.integers(1, 10, count), 'h': h}
+    if kind == 'square_area':
+        return {'p': rng.integers(1, 20, count) * 4}
+    raise ValueError(f"未知的练习题类型: {kind}")
+
+
+# ---------------------------------------------------------------------------
+# 内容导入：从CSV内容表格流式读取定义、性质和练习题，解析为幻灯片规格
+# ---------------------------------------------------------------------------
+
+# 内容表格的列：deck为所属的一套PPT，slide为幻灯片编号，role为该行内容的类型
+CONTENT_COLUMNS = ('deck', 'slide', 'role', 'text')
+CONTENT_ROLES = ('title', 'definition', 'property', 'exercise', 'diagram')
+
+# 每张幻灯片最多的要点数（性质和练习题合计），超过时文字会溢出版面
+MAX_SLIDE_ITEMS = 10
+
+
+def read_content_rows(path):
+    """逐行读取内容表格，产生(行号, 行字典)；支持Excel导出的带BOM的UTF-8"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in CONTENT_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{path}: 缺少列: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, {column: (row[column] or '').strip() for column in CONTENT_COLUMNS}
+
+
+def parse_slide_specs(rows, source='<rows>'):
+    """把连续的同一张幻灯片的行合并为规格，产生(deck, 规格字典)
+
+    规格字典包含title、definition、properties、exercises和diagram。同一套PPT和同一张幻灯片
+    的行必须连续，这样只需持有当前这一张幻灯片；不符合要求的内容抛出ValueError并指出行号。
+    """
+    finished_decks = set()
+    finished_slides = set()
+    current = None
+    spec = None
+    start = None
+    
+    def close():
+        if spec['title'] is None:
+            raise ValueError(f"{source}:{start}: 幻灯片{current[1]}缺少title")
+        if len(spec['properties']) + len(spec['exercises']) > MAX_SLIDE_ITEMS:
+            raise ValueError(f"{source}:{start}: 幻灯片{current[1]}的要点超过{MAX_SLIDE_ITEMS}条")
+        return current[0], spec
+    
+    for line, row in rows:
+        deck, slide, role, text = (row[column] for column in CONTENT_COLUMNS)
+        where = f"{source}:{line}"
+        if not re.fullmatch(r'[\w.-]+', deck):
+            raise ValueError(f"{where}: deck只能包含字母、数字、下划线、点和连字符: {deck!r}")
+        if not re.fullmatch(r'[0-9]+', slide):
+            raise ValueError(f"{where}: slide必须是幻灯片编号（数字）: {slide!r}")
+        if role not in CONTENT_ROLES:
+            raise ValueError(f"{where}: 未知的内容类型: {role!r}")
+        if not text:
+            raise ValueError(f"{where}: text为空")
+        if (deck, slide) != current:
+            if spec is not None:
+                yield close()
+                if deck != current[0]:
+                    finished_decks.add(current[0])
+                    finished_slides.clear()
+                else:
+                    finished_slides.add(current[1])
+            if deck in finished_decks:
+                raise ValueError(f"{where}: deck {deck}的行不连续")
+            if slide in finished_slides:
+                raise ValueError(f"{where}: 幻灯片{slide}的行不连续")
+            current = (deck, slide)
+            spec = {'title': None, 'definition': None, 'properties': [], 'exercises': [], 'diagram': None}
+            start = line
+        if role == 'property':
+            spec['properties'].append(text)
+        elif role == 'exercise':
+            spec['exercises'].append(text)
+        else:
+            if spec[role] is not None:
+                raise ValueError(f"{where}: 幻灯片{slide}有多个{role}")
+            if role == 'diagram' and text not in DIAGRAM_LIBRARY:
+                raise ValueError(f"{where}: 未知的图形: {text}")
+            spec[role] = text
+    if spec is not None:
+        yield close()
+
+
+def iter_content_decks(path):
+    """流式读取内容表格，每读完一套PPT产生一次(deck, [规格])，内存中只保留当前这一套"""
+    deck = None
+    specs = []
+    for spec_deck, spec in parse_slide_specs(read_content_rows(path), source=path):
+        if spec_deck != deck and specs:
+            yield deck, specs
+            specs = []
+        deck = spec_deck
+        specs.append(spec)
+    if specs:
+        yield deck, specs
+
+
+def content_jobs(path, output, **options):
+    """为内容表格中的每套PPT产生一个生成任务，输出文件名加deck后缀（四边形.pptx -> 四边形.<deck>.pptx）
+
+    任务在需要时才从表格中读取，可以直接交给run_jobs流式执行。
+    """
+    root, ext = os.path.splitext(output)
+    for deck, specs in iter_content_decks(path):
+        yield dict(options, output=f"{root}.{deck}{ext}", content=specs)
+
+
+# ---------------------------------------------------------------------------
+# 交互式HTML导出：可拖动顶点的几何小组件，性质检验结果预先在参数网格上批量计算
+# ---------------------------------------------------------------------------
+
+def _seg(P, i, j):
+    """顶点i、j之间的距离，P形状为(4, 2, ...)"""
+    return np.hypot(P[i, 0] - P[j, 0], P[i, 1] - P[j, 1])
+
+
+def _angle(P, i):
+    """顶点i处的内角（度）"""
+    u = P[(i - 1) % 4] - P[i]
+    v = P[(i + 1) % 4] - P[i]
+    cos = (u[0] * v[0] + u[1] * v[1]) / (np.hypot(u[0], u[1]) * np.hypot(v[0], v[1]))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def _diagonal_intersection(P):
+    """对角线AC与BD的交点O"""
+    r = P[2] - P[0]
+    s = P[3] - P[1]
+    q = P[1] - P[0]
+    t = (q[0] * s[1] - q[1] * s[0]) / (r[0] * s[1] - r[1] * s[0])
+    return P[0] + t * r
+
+
+def _to_o(P, i):
+    """顶点i到对角线交点O的距离"""
+    O = _diagonal_intersection(P)
+    return np.hypot(P[i, 0] - O[0], P[i, 1] - O[1])
+
+
+def _diagonal_angle(P):
+    """两条对角线的夹角∠AOB（度）"""
+    O = _diagonal_intersection(P)
+    u = P[0] - O
+    v = P[1] - O
+    cos = (u[0] * v[0] + u[1] * v[1]) / (np.hypot(u[0], u[1]) * np.hypot(v[0], v[1]))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def _right_angle(P):
+    return np.full(P.shape[2:], 90.0)
+
+
+# 交互组件：(对应幻灯片, 标题, 颜色, 可拖动顶点, u范围, v范围, 由(u, v)计算四个顶点, 性质列表)
+# u、v范围为(起点, 终点, 网格点数)，v只有一个点时只能水平拖动；
+# 顶点坐标与对应create_*方法中的图形一致，性质为(左边名称, 左边, 右边名称, 右边)
+FIGURE_WIDGETS = (
+    ('create_parallelogram_intro', "平行四边形：拖动顶点D", 'green', 3,
+     (-1.0, 3.0, 21), (0.5, 3.0, 11),
+     lambda u, v: np.array([[0 * u, 0 * v], [3 + 0 * u, 0 * v], [3 + u, v], [u, v]]),
+     (("AB", lambda P: _seg(P, 0, 1), "CD", lambda P: _seg(P, 2, 3)),
+      ("AD", lambda P: _seg(P, 0, 3), "BC", lambda P: _seg(P, 1, 2)),
+      ("∠A", lambda P: _angle(P, 0), "∠C", lambda P: _angle(P, 2)),
+      ("AO", lambda P: _to_o(P, 0), "OC", lambda P: _to_o(P, 2)),
+      ("BO", lambda P: _to_o(P, 1), "OD", lambda P: _to_o(P, 3)))),
+    ('create_rectangle_slide', "矩形：拖动顶点C", 'orange', 2,
+     (1.0, 5.0, 21), (1.0, 4.0, 16),
+     lambda u, v: np.array([[0 * u, 0 * v], [u, 0 * v], [u, v], [0 * u, v]]),
+     (("AC", lambda P: _seg(P, 0, 2), "BD", lambda P: _seg(P, 1, 3)),
+      ("∠A", lambda P: _angle(P, 0), "90°", _right_angle),
+      ("∠C", lambda P: _angle(P, 2), "90°", _right_angle),
+      ("AO", lambda P: _to_o(P, 0), "BO", lambda P: _to_o(P, 1)))),
+    ('create_rhombus_slide', "菱形：拖动顶点B", 'purple', 1,
+     (1.5, 4.0, 26), (2.0, 2.0, 1),
+     lambda u, v: np.array([[1 + 0 * u, 0 * v], [u, v], [1 + 0 * u, 4 + 0 * v], [2 - u, v]]),
+     (("AB", lambda P: _seg(P, 0, 1), "BC", lambda P: _seg(P, 1, 2)),
+      ("CD", lambda P: _seg(P, 2, 3), "DA", lambda P: _seg(P, 3, 0)),
+      ("∠AOB", _diagonal_angle, "90°", _right_angle),
+      ("AO", lambda P: _to_o(P, 0), "OC", lambda P: _to_o(P, 2)))),
+    ('create_square_slide', "正方形：拖动顶点C", 'red', 2,
+     (1.0, 4.0, 31), (0.0, 0.0, 1),
+     lambda u, v: np.array([[0 * u, 0 * v], [u, 0 * v], [u, u + v], [0 * u, u + v]]),
+     (("AB", lambda P: _seg(P, 0, 1), "BC", lambda P: _seg(P, 1, 2)),
+      ("AC", lambda P: _seg(P, 0, 2), "BD", lambda P: _seg(P, 1, 3)),
+      ("∠AOB", _diagonal_angle, "90°", _right_angle))),
+    ('create_trapezoid_classification', "等腰梯形：拖动顶点D", 'green', 3,
+     (0.1, 1.8, 18), (1.0, 4.0, 16),
+     lambda u, v: np.array([[0 * u, 0 * v], [4 + 0 * u, 0 * v], [4 - u, v], [u, v]]),
+     (("AD", lambda P: _seg(P, 0, 3), "BC", lambda P: _seg(P, 1, 2)),
+      ("AC", lambda P: _seg(P, 0, 2), "BD", lambda P: _seg(P, 1, 3)),
+      ("∠A", lambda P: _angle(P, 0), "∠B", lambda P: _angle(P, 1)))),
+)
+
+# SVG坐标：1个数据单位对应的像素数，以及画布留白
+WIDGET_SCALE = 60
+WIDGET_MARGIN = 30
+
+
+def compute_widget_states(widget):
+    """在(u, v)参数网格上一次性计算所有状态的顶点和性质数值（numpy向量化）
+
+    返回可直接序列化为JSON的字典：SVG坐标取整，性质数值保留2位小数。
+    """
+    _, title, color, handle, u_range, v_range, vertices, invariants = widget
+    us = np.linspace(*u_range)
+    vs = np.linspace(*v_range)
+    U, V = np.meshgrid(us, vs, indexing='ij')
+    P = vertices(U, V)  # (4, 2, nu, nv)
+    
+    xmin = float(P[:, 0].min()) - 0.5
+    ymax = float(P[:, 1].max()) + 0.5
+    width = (float(P[:, 0].max()) + 0.5 - xmin) * WIDGET_SCALE + 2 * WIDGET_MARGIN
+    height = (ymax - float(P[:, 1].min()) + 0.5) * WIDGET_SCALE + 2 * WIDGET_MARGIN
+    sx = (P[:, 0] - xmin) * WIDGET_SCALE + WIDGET_MARGIN
+    sy = (ymax - P[:, 1]) * WIDGET_SCALE + WIDGET_MARGIN
+    # 每个状态8个数：A、B、C、D的SVG坐标
+    points = np.stack([sx, sy], axis=1).reshape(8, -1).T
+    
+    checks = []
+    for left_name, left, right_name, right in invariants:
+        lv = np.round(left(P).ravel(), 2)
+        rv = np.round(right(P).ravel(), 2)
+        checks.append({
+            'left': left_name,
+            'right': right_name,
+            'values': np.stack([lv, rv], axis=1).ravel().tolist(),
+        })
+    
+    return {
+        'title': title,
+        'color': color,
+        'handle': handle,
+        'size': [round(width), round(height)],
+        'grid': [len(us), len(vs)],
+        # 指针位置 -> 网格下标：u = u0 + (x - margin) / scale ...
+        'u': [float(us[0]), float(us[1] - us[0]) if len(us) > 1 else 1.0],
+        'v': [float(vs[0]), float(vs[1] - vs[0]) if len(vs) > 1 else 1.0],
+        'origin': [xmin, ymax],
+        'scale': WIDGET_SCALE,
+        'margin': WIDGET_MARGIN,
+        'points': np.rint(points).astype(int).ravel().tolist(),
+        'checks': checks,
+    }
+
+
+_WIDGET_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+.widget {{ display: flex; gap: 2em; align-items: flex-start; margin-bottom: 3em; }}
+svg {{ border: 1px solid #ccc; touch-action: none; }}
+.handle {{ cursor: grab; }}
+td {{ padding: 2px 10px; font-family: monospace; }}
+.ok {{ color: green; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<div id="widgets"></div>
+<script>
+const WIDGETS = {data};
+const NS = 'http://www.w3.org/2000/svg';
+function el(name, attrs, parent) {{
+  const e = document.createElementNS(NS, name);
+  for (const k in attrs) e.setAttribute(k, attrs[k]);
+  parent.appendChild(e);
+  return e;
+}}
+WIDGETS.forEach(w => {{
+  const box = document.createElement('div');
+  box.innerHTML = '<h2>' + w.title + '</h2>';
+  const row = document.createElement('div');
+  row.className = 'widget';
+  box.appendChild(row);
+  document.getElementById('widgets').appendChild(box);
+  const svg = el('svg', {{width: w.size[0], height: w.size[1]}}, row);
+  const poly = el('polygon', {{fill: 'none', stroke: w.color, 'stroke-width': 2}}, svg);
+  const d1 = el('line', {{stroke: 'red', 'stroke-dasharray': '4 3'}}, svg);
+  const d2 = el('line', {{stroke: 'red', 'stroke-dasharray': '4 3'}}, svg);
+  const labels = ['A', 'B', 'C', 'D'].map(t => {{ const e = el('text', {{}}, svg); e.textContent = t; return e; }});
+  const handle = el('circle', {{r: 7, fill: w.color, class: 'handle'}}, svg);
+  const table = document.createElement('table');
+  row.appendChild(table);
+  const cells = w.checks.map(c => {{ const tr = table.insertRow(); return tr; }});
+  function show(s) {{
+    const p = w.points.slice(s * 8, s * 8 + 8);
+    poly.setAttribute('points', p.join(' '));
+    [[d1, 0, 2], [d2, 1, 3]].forEach(([l, i, j]) => {{
+      l.setAttribute('x1', p[2 * i]); l.setAttribute('y1', p[2 * i + 1]);
+      l.setAttribute('x2', p[2 * j]); l.setAttribute('y2', p[2 * j + 1]);
+    }});
+    labels.forEach((t, i) => {{ t.setAttribute('x', p[2 * i] + 6); t.setAttribute('y', p[2 * i + 1] - 6); }});
+    handle.setAttribute('cx', p[2 * w.handle]); handle.setAttribute('cy', p[2 * w.handle + 1]);
+    w.checks.forEach((c, k) => {{
+      const a = c.values[2 * s], b = c.values[2 * s + 1];
+      cells[k].innerHTML = '<td>' + c.left + ' = ' + a.toFixed(2) + '</td><td>' + c.right + ' = ' + b.toFixed(2) +
+        '</td><td class="ok">' + (Math.round(Math.abs(a - b) * 100) <= 1 ? '✓' : '') + '</td>';
+    }});
+  }}
+  function index(evt) {{
+    const pt = new DOMPoint(evt.clientX, evt.clientY).matrixTransform(svg.getScreenCTM().inverse());
+    const u = w.origin[0] + (pt.x - w.margin) / w.scale;
+    const v = w.origin[1] - (pt.y - w.margin) / w.scale;
+    const clamp = (x, n) => Math.max(0, Math.min(n - 1, Math.round(x)));
+    return clamp((u - w.u[0]) / w.u[1], w.grid[0]) * w.grid[1] + clamp((v - w.v[0]) / w.v[1], w.grid[1]);
+  }}
+  let dragging = false;
+  handle.addEventListener('pointerdown', e => {{ dragging = true; handle.setPointerCapture(e.pointerId); }});
+  handle.addEventListener('pointermove', e => {{ if (dragging) show(index(e)); }});
+  handle.addEventListener('pointerup', () => {{ dragging = false; }});
+  show(Math.floor(w.grid[0] / 2) * w.grid[1] + Math.floor(w.grid[1] / 2));
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def export_html(path, slides=DEFAULT_SLIDES, title="四边形 - 交互图形"):
+    """导出交互式HTML页面，包含所选幻灯片对应的可拖动图形
+
+    所有状态的性质数值都在导出时预先算好，页面加载后只做查表。
+    """
+    selected = set(slides)
+    widgets = [compute_widget_states(w) for w in FIGURE_WIDGETS if w[0] in selected]
+    data = json.dumps(widgets, ensure_ascii=False, separators=(',', ':'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_WIDGET_HTML.format(title=title, data=data))
+    return len(widgets)
+
+
+def build_locales(locales, slides=DEFAULT_SLIDES, cache=None, stats=None, **options):
+    """一次生成多种语言的同一套PPT，返回{语言: 字节串}
+
+    各语言共用一个diagram_cache：不含文字的图形只渲染一次，
+    含文字的图形只重绘文字层。
+    """
+    diagram_cache = options.pop('diagram_cache', None)
+    if diagram_cache is None:
+        diagram_cache = {}
+    if stats is not None:
+        stats.update(diagrams=0, cached=True)
+    decks = {}
+    for locale in locales:
+        deck_stats = {}
+        decks[locale] = build_deck(slides, cache=cache, stats=deck_stats, locale=locale,
+                                   diagram_cache=diagram_cache, **options)
+        if stats is not None:
+            stats['diagrams'] += deck_stats['diagrams']
+            stats['cached'] = stats['cached'] and deck_stats['cached']
+    return decks
+
+
+def locale_output_path(path, locale):
+    """多语言输出的文件名：四边形.pptx -> 四边形.en.pptx"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{locale}{ext}"
+
+
+def _print_section_progress(section):
+    """打印章节进度信息"""
+    message = SECTION_MESSAGES.get(section)
+    if message:
+        print(message)
+
+
+def load_manifest(path):
+    """读取批量任务清单（JSON），返回任务列表
+
+    清单可以是任务数组，也可以是{"decks": [...]}；每个任务至少包含output，
+    可选sections、slides、no_frame、with_dependencies、renderer、dpi_profile、dpi、
+    deterministic、build_steps、fast_text、answer_key、max_bytes（体积预算，字节）、
+    asset_pack（共享资源包文件）、html（同时导出交互式HTML的路径）、
+    locale（语言）或locales（多种语言，输出文件名加语言后缀）。
+    相对路径的output和html以清单文件所在目录为基准。
+    """
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    jobs = manifest['decks'] if isinstance(manifest, dict) else manifest
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for job in jobs:
+        if 'output' not in job:
+            raise ValueError(f"清单任务缺少output: {job}")
+        job['output'] = os.path.join(base_dir, job['output'])
+        if job.get('html'):
+            job['html'] = os.path.join(base_dir, job['html'])
+        if job.get('asset_pack'):
+            job['asset_pack'] = os.path.join(base_dir, job['asset_pack'])
+    return jobs
+
+
+class MemoryWatchdog:
+    """跟踪每套PPT生成后的内存占用，超过上限时提示回收工作进程
+
+    每次check()记录当前RSS；trace为True时同时用tracemalloc做快照，
+    并给出与上一次快照相比增长最多的代码位置，便于定位泄漏。
+    """
+    
+    def __init__(self, max_rss=None, trace=False, top=5):
+        """max_rss为RSS上限（字节），None表示不限制"""
+        self.max_rss = max_rss
+        self.trace = trace
+        self.top = top
+        self.samples = []
+        self._snapshot = None
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    @staticmethod
+    def current_rss():
+        """当前进程的常驻内存（字节）"""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            # 非Linux平台退而使用峰值RSS（macOS单位为字节，其他为KB）
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+    
+    def check(self, label=None):
+        """记录一次采样并返回采样字典，sample['over_limit']表示是否超过上限"""
+        gc.collect()
+        sample = {'label': label, 'rss': self.current_rss()}
+        if self.trace:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),))
+            sample['traced'] = sum(stat.size for stat in snapshot.statistics('filename'))
+            if self._snapshot is not None:
+                sample['growth'] = [str(stat) for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self.top]
+                                    if stat.size_diff > 0]
+            self._snapshot = snapshot
+        sample['over_limit'] = self.max_rss is not None and sample['rss'] > self.max_rss
+        self.samples.append(sample)
+        return sample
+    
+    def leak_suspected(self, window=5, min_growth=8 * 2**20):
+        """最近window次采样的RSS持续增长且累计超过min_growth字节时返回True"""
+        recent = [sample['rss'] for sample in self.samples[-window:]]
+        return (len(recent) == window and recent[-1] - recent[0] >= min_growth
+                and all(a <= b for a, b in zip(recent, recent[1:])))
+
+
+# 工作进程内的内存监控（由_init_worker设置）
+_WORKER_WATCHDOG = None
+
+
+def _init_worker(max_rss=None, trace=False):
+    """工作进程初始化：每个进程一个内存监控"""
+    global _WORKER_WATCHDOG
+    _WORKER_WATCHDOG = MemoryWatchdog(max_rss, trace)
+
+
+# 每个进程按缓存目录共用的图形库
+_DIAGRAM_LIBRARIES = {}
+
+
+def _diagram_library(cache_dir):
+    """返回缓存目录下的图形库（<cache_dir>/diagrams），同一进程内只创建一次"""
+    if cache_dir not in _DIAGRAM_LIBRARIES:
+        _DIAGRAM_LIBRARIES[cache_dir] = DiagramLibrary(os.path.join(cache_dir, 'diagrams'))
+    return _DIAGRAM_LIBRARIES[cache_dir]
+
+
+# 每个进程按路径共用的资源包映射
+_ASSET_PACKS = {}
+
+
+def _asset_pack(path):
+    """返回资源包的只读映射，同一进程内每个文件只映射一次"""
+    if path not in _ASSET_PACKS:
+        _ASSET_PACKS[path] = AssetPack(path)
+    return _ASSET_PACKS[path]
+
+
+def _run_deck_job(job, cache_dir=None, progress=None):
+    """执行一个生成任务并写出文件，异常不向外抛出，结果以字典返回"""
+    started = time.perf_counter()
+    result = {'output': job['output'], 'ok': False, 'error': None,
+              'diagrams': 0, 'cached': False, 'bytes': 0}
+    cache = None
+    try:
+        slides = resolve_slides(job.get('slides'), job.get('sections'),
+                                include_frame=not job.get('no_frame', False),
+                                with_dependencies=job.get('with_dependencies', False))
+        dpi = job.get('dpi') or DPI_PROFILES[job.get('dpi_profile', 'print')]
+        cache = DeckCache(cache_dir) if cache_dir else None
+        stats = {}
+        options = dict(renderer=job.get('renderer', 'raster'), dpi=dpi,
+                       deterministic=job.get('deterministic', False),
+                       build_steps=job.get('build_steps', False),
+                       fast_text=job.get('fast_text', False),
+                       thread_safe=job.get('thread_safe', False),
+                       answer_key=job.get('answer_key', False), content=job.get('content'),
+                       asset_pack=_asset_pack(job['asset_pack']) if job.get('asset_pack') else None)
+        if job.get('locales'):
+            decks = build_locales(job['locales'], slides, cache=cache, stats=stats, **options)
+            outputs = {locale_output_path(job['output'], locale): data for locale, data in decks.items()}
+        else:
+            library = _diagram_library(cache_dir) if cache_dir else None
+            data = build_deck(slides, cache=cache, stats=stats, progress=progress,
+                              locale=job.get('locale', SOURCE_LOCALE), diagram_library=library, **options)
+            outputs = {job['output']: data}
+        if job.get('max_bytes'):
+            # 各语言版本共用图片编码缓存
+            encodings = {}
+            reports = []
+            for path in outputs:
+                outputs[path], report = fit_pptx_to_budget(outputs[path], job['max_bytes'],
+                                                           options['deterministic'], encodings)
+                reports.append(report)
+            result['over_budget'] = [path for path, report in zip(outputs, reports) if not report['fits']]
+            result['budget_seconds'] = sum(report['seconds'] for report in reports)
+        for path, data in outputs.items():
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        if job.get('html'):
+            export_html(job['html'], slides)
+        result.update(stats, ok=True, bytes=sum(len(data) for data in outputs.values()))
+        if result.get('over_budget'):
+            # 文件照常写出以便检查，但任务记为失败，批处理以非零状态退出
+            result.update(ok=False, error=f"降到最低画质后仍超出体积预算: {', '.join(result['over_budget'])}")
+        del data, outputs  # 内存采样前释放本套PPT的字节
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    if cache is not None:
+        # 每个任务单独打开缓存，计数随结果返回，由run_jobs汇总
+        result.update(cache_hits=cache.hits, cache_misses=cache.misses, cache_evictions=cache.evictions)
+    result['seconds'] = time.perf_counter() - started
+    if _WORKER_WATCHDOG is not None:
+        sample = _WORKER_WATCHDOG.check(job['output'])
+        result['rss'] = sample['rss']
+        result['recycle'] = sample['over_limit']
+        result['leak_suspected'] = _WORKER_WATCHDOG.leak_suspected()
+        if sample.get('growth'):
+            result['memory_growth'] = sample['growth']
+    return result
+
+
+def _run_jobs_in_pool(jobs, workers, cache_dir, max_rss, trace_memory, report):
+    """在进程池中执行任务；某个工作进程的RSS超过上限时，等在途任务完成后重建进程池
+
+    工作进程意外退出（如被系统因内存不足杀掉）时，进程池中的在途任务都会中断。
+    只有一个在途任务时它记为失败；否则重建进程池后把这些任务逐个重新执行一次，
+    再次导致进程退出的任务才记为失败，其余任务照常完成。
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+    
+    pending = iter(jobs)
+    job = next(pending, None)
+    retry = []
+    while job is not None or retry:
+        recycle = broken = False
+        crashed = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(max_rss, trace_memory)) as pool:
+            running = {}
+            while job is not None or retry or running:
+                while not (recycle or broken):
+                    # 重新执行的任务单独运行，再次崩溃时即可确定是它导致的
+                    if retry and not running:
+                        next_job = retry[0]
+                    elif not retry and job is not None and len(running) < workers:
+                        next_job = job
+                    else:
+                        break
+                    try:
+                        running[pool.submit(_run_deck_job, next_job, cache_dir)] = next_job
+                    except BrokenProcessPool:
+                        broken = True
+                        break
+                    if retry:
+                        retry.pop(0)
+                    else:
+                        job = next(pending, None)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    failed_job = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        crashed.append(failed_job)
+                        continue
+                    report(result)
+                    recycle = recycle or result.get('recycle', False)
+        if len(crashed) == 1:
+            report({'output': crashed[0]['output'], 'ok': False,
+                    'error': "工作进程异常退出（BrokenProcessPool）",
+                    'diagrams': 0, 'cached': False, 'bytes': 0, 'seconds': 0.0})
+        else:
+            retry.extend(crashed)
+        if broken and (job is not None or retry):
+            print("工作进程异常退出，重建进程池", file=sys.stderr)
+        elif recycle and (job is not None or retry):
+            print("工作进程内存超过上限，重建进程池", file=sys.stderr)
+
+
+def _run_jobs_in_threads(jobs, workers, cache_dir, report):
+    """在线程池中执行任务，生成器使用thread_safe模式，不经过pyplot的全局状态"""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        for job in jobs:
+            # 限制在途任务数，任务来自流式读取的内容表格时内存有界
+            if len(running) >= 2 * workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(future.result())
+            running.add(pool.submit(_run_deck_job, dict(job, thread_safe=True), cache_dir))
+        for future in wait(running).done:
+            report(future.result())
+
+
+def run_jobs(jobs, workers=1, cache_dir=None, quiet=False, max_rss=None, trace_memory=False,
+             threads=False):
+    """批量生成PPT，单个任务失败不影响其余任务，返回全部结果
+
+    jobs可以是列表或按需产生任务的迭代器（如content_jobs），任务逐个取出执行。
+    workers大于1时默认使用多进程；threads为True时改用线程池（thread_safe模式），
+    python-pptx序列化和zlib压缩释放GIL的部分可以重叠执行。
+    指定max_rss（字节）时总是在子进程中生成，进程内存超过上限即回收重建；
+    trace_memory为True时用tracemalloc记录每套PPT之后的内存增长。
+    """
+    global _WORKER_WATCHDOG
+    results = []
+    started = time.perf_counter()
+    total = len(jobs) if hasattr(jobs, '__len__') else None
+    
+    def report(result):
+        results.append(result)
+        if quiet:
+            return
+        counter = f"[{len(results)}/{total}]" if total is not None else f"[{len(results)}]"
+        if result['ok']:
+            detail = "缓存命中" if result['cached'] else f"{result['diagrams']}幅图"
+            if 'rss' in result:
+                detail += f", RSS {result['rss'] / 2**20:.0f}MB"
+            if 'budget_seconds' in result:
+                detail += f", {result['bytes'] / 2**20:.2f}MB, 压缩{result['budget_seconds']:.2f}s"
+            print(f"{counter} {result['output']} 完成 "
+                  f"({result['seconds']:.2f}s, {detail})")
+        else:
+            print(f"{counter} {result['output']} 失败: {result['error']}",
+                  file=sys.stderr)
+        if result.get('leak_suspected'):
+            print("  警告: 内存持续增长，可能存在泄漏", file=sys.stderr)
+        for line in result.get('memory_growth', ()):
+            print(f"  {line}", file=sys.stderr)
+    
+    if threads and workers > 1:
+        _run_jobs_in_threads(jobs, workers, cache_dir, report)
+    elif workers <= 1 and max_rss is None:
+        # 只有一套PPT时打印章节进度
+        progress = _print_section_progress if total == 1 and not quiet else None
+        _WORKER_WATCHDOG = MemoryWatchdog(trace=trace_memory) if trace_memory else None
+        try:
+            for job in jobs:
+                report(_run_deck_job(job, cache_dir, progress))
+        finally:
+            _WORKER_WATCHDOG = None
+    else:
+        _run_jobs_in_pool(jobs, max(workers, 1), cache_dir, max_rss, trace_memory, report)
+    
+    elapsed = time.perf_counter() - started
+    if not quiet:
+        failed = [r for r in results if not r['ok']]
+        diagrams = sum(r['diagrams'] for r in results)
+        print(f"共{len(results)}套，成功{len(results) - len(failed)}套，失败{len(failed)}套，"
+              f"用时{elapsed:.2f}s（{len(results) / elapsed:.2f} 套/秒，{diagrams / elapsed:.1f} 图/秒）")
+        if cache_dir:
+            stats = DeckCache(cache_dir).stats()
+            hits = sum(r.get('cache_hits', 0) for r in results)
+            lookups = hits + sum(r.get('cache_misses', 0) for r in results)
+            print(f"缓存: 命中率{hits / lookups if lookups else 0.0:.0%}（{hits}/{lookups}），"
+                  f"淘汰{sum(r.get('cache_evictions', 0) for r in results)}项，"
+                  f"当前{stats['entries']}项 {stats['bytes'] / 2**20:.1f}MB")
+        for r in failed:
+            print(f"  失败: {r['output']}: {r['error']}", file=sys.stderr)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 黄金输出回归检查：逐个create_*方法比较规范化的幻灯片XML和图片的感知差异
+# ---------------------------------------------------------------------------
+
+# 图片差异超过该比例（按像素块计）时判定为不同
+GOLDEN_TOLERANCE = 0.005
+
+# 像素块的灰度差超过该值（0~255）才计为不同，用于忽略抗锯齿和重新编码带来的细微差别
+GOLDEN_BLOCK_THRESHOLD = 8
+
+
+def normalize_slide_xml(xml):
+    """规范化幻灯片XML以便比较：去掉随图片文件名变化的descr属性，并按固定缩进输出"""
+    from lxml import etree
+    root = etree.fromstring(xml, etree.XMLParser(remove_blank_text=True))
+    for element in root.iter(qn('p:cNvPr')):
+        element.attrib.pop('descr', None)
+    return etree.tostring(root, pretty_print=True, encoding='unicode')
+
+
+def perceptual_diff(png_a, png_b, block=4):
+    """两张图片的感知差异：差异明显的像素块所占比例（0~1）
+
+    图片先叠加到白色背景并转为灰度，按block×block像素块取平均后再比较，
+    因此对抗锯齿、调色板和重新压缩不敏感。尺寸不同时把第二张缩放到第一张的尺寸。
+    """
+    from PIL import Image
+    
+    def gray(png, size=None):
+        with Image.open(io.BytesIO(png)) as image:
+            image = image.convert('RGBA')
+            if size is not None and image.size != size:
+                image = image.resize(size, Image.LANCZOS)
+            white = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            return np.asarray(Image.alpha_composite(white, image).convert('L'), dtype=float)
+    
+    a = gray(png_a)
+    b = gray(png_b, size=(a.shape[1], a.shape[0]))
+    h, w = (a.shape[0] // block) * block, (a.shape[1] // block) * block
+    if not h or not w:
+        return float(np.mean(np.abs(a - b) > GOLDEN_BLOCK_THRESHOLD))
+    
+    def blocks(image):
+        return image[:h, :w].reshape(h // block, block, w // block, block).mean(axis=(1, 3))
+    
+    return float(np.mean(np.abs(blocks(a) - blocks(b)) > GOLDEN_BLOCK_THRESHOLD))
+
+
+def golden_snapshot(name, **options):
+    """只构建一个create_*方法的幻灯片，返回{部件名: 内容}：slideN.xml为规范化XML，media/下为图片字节
+
+    目录等随所选内容变化的幻灯片按整套PPT（DEFAULT_SLIDES）生成，
+    检查其中几个方法时基准也不会因为选择不同而变化。
+    """
+    options['deterministic'] = True
+    with QuadrilateralsPPTGenerator(**options) as ppt:
+        ppt.selected_slides = DEFAULT_SLIDES
+        getattr(ppt, name)()
+        data = ppt.to_bytes()
+    snapshot = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as deck:
+        for part in deck.namelist():
+            if re.fullmatch(r'ppt/slides/slide\d+\.xml', part):
+                snapshot[os.path.basename(part)] = normalize_slide_xml(deck.read(part))
+            elif part.startswith('ppt/media/'):
+                snapshot['media/' + os.path.basename(part)] = deck.read(part)
+    return snapshot
+
+
+def _golden_options(options):
+    """基准目录中记录的生成选项（只保留能写入JSON的部分）"""
+    return json.loads(json.dumps(options, sort_keys=True, default=str))
+
+
+def _update_golden_method(name, baseline_dir, options):
+    """重新生成一个方法的基准文件"""
+    import shutil
+    target = os.path.join(baseline_dir, name)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.makedirs(os.path.join(target, 'media'))
+    snapshot = golden_snapshot(name, **options)
+    for part, content in snapshot.items():
+        mode, encoding = ('w', 'utf-8') if isinstance(content, str) else ('wb', None)
+        with open(os.path.join(target, part), mode, encoding=encoding) as f:
+            f.write(content)
+    return {'name': name, 'ok': True, 'parts': len(snapshot)}
+
+
+def _check_golden_method(name, baseline_dir, options, tolerance=GOLDEN_TOLERANCE):
+    """生成一个方法的幻灯片并与基准比较，返回结果字典（差异列表为空表示一致）"""
+    import difflib
+    started = time.perf_counter()
+    result = {'name': name, 'ok': False, 'missing': [], 'extra': [], 'xml': {}, 'images': {}}
+    target = os.path.join(baseline_dir, name)
+    if not os.path.isdir(target):
+        result['error'] = "没有基准"
+        return result
+    try:
+        snapshot = golden_snapshot(name, **options)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+    expected = {part for part in os.listdir(target) if part.endswith('.xml')}
+    expected.update('media/' + part for part in os.listdir(os.path.join(target, 'media')))
+    result['missing'] = sorted(expected - set(snapshot))
+    result['extra'] = sorted(set(snapshot) - expected)
+    for part in sorted(expected & set(snapshot)):
+        if part.endswith('.xml'):
+            with open(os.path.join(target, part), encoding='utf-8') as f:
+                baseline = f.read()
+            if baseline != snapshot[part]:
+                diff = difflib.unified_diff(baseline.splitlines(), snapshot[part].splitlines(),
+                                            'baseline/' + part, 'current/' + part, lineterm='', n=1)
+                result['xml'][part] = list(diff)[:20]
+        else:
+            with open(os.path.join(target, part), 'rb') as f:
+                baseline = f.read()
+            if baseline != snapshot[part]:
+                score = perceptual_diff(baseline, snapshot[part])
+                if score > tolerance:
+                    result['images'][part] = score
+    result['ok'] = not (result['missing'] or result['extra'] or result['xml'] or result['images'])
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_golden(baseline_dir, update=False, slides=DEFAULT_SLIDES, workers=None,
+               tolerance=GOLDEN_TOLERANCE, **options):
+    """用多进程逐个create_*方法检查（或update为True时重新生成）黄金基准，返回每个方法的结果列表
+
+    基准目录的options.json记录生成基准时的选项；检查时选项不同会直接报错，
+    以免把选项变化误报为回归。基准只在显式指定update时才会改写；
+    改变选项时必须更新目录中的全部方法，否则未更新的基准会与options.json不符。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    recorded = _golden_options(options)
+    options_path = os.path.join(baseline_dir, 'options.json')
+    if update:
+        try:
+            with open(options_path, encoding='utf-8') as f:
+                baseline_options = json.load(f)
+        except OSError:
+            baseline_options = recorded
+        if baseline_options != recorded:
+            stale = sorted(name for name in os.listdir(baseline_dir)
+                           if os.path.isdir(os.path.join(baseline_dir, name)) and name not in slides)
+            if stale:
+                raise ValueError(f"生成选项与基准不同（基准: {baseline_options}），"
+                                 f"只更新部分方法会使{', '.join(stale)}的基准失效，请更新全部方法")
+        os.makedirs(baseline_dir, exist_ok=True)
+        with open(options_path, 'w', encoding='utf-8') as f:
+            json.dump(recorded, f, ensure_ascii=False, indent=2, sort_keys=True)
+    else:
+        try:
+            with open(options_path, encoding='utf-8') as f:
+                baseline_options = json.load(f)
+        except OSError:
+            raise ValueError(f"{baseline_dir}中没有基准，请先更新基准")
+        if baseline_options != recorded:
+            raise ValueError(f"生成选项与基准不同（基准: {baseline_options}），请使用相同选项或更新基准")
+    
+    task = _update_golden_method if update else _check_golden_method
+    extra = () if update else (tolerance,)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task, name, baseline_dir, options, *extra) for name in slides]
+        return [future.result() for future in futures]
+
 
 # 主函数
-def main():
-    """主函数"""
-    # 创建PPT生成器实例
-    ppt = QuadrilateralsPPTGenerator("四边形.pptx")
-    
-    print("开始生成四边形PPT...")
-    
-    # 创建基本框架
-    ppt.create_cover_slide()
-    ppt.create_table_of_contents()
-    ppt.create_basic_concepts_slide()
-    
-    # 创建平行四边形章节
-    print("创建平行四边形章节...")
-    ppt.create_parallelogram_intro()
-    ppt.create_parallelogram_properties()
-    ppt.create_parallelogram_theorems()
-    
-    # 创建特殊平行四边形章节
-    print("创建特殊平行四边形章节...")
-    ppt.create_special_parallelogram_relationship()  # 先介绍关系
-    ppt.create_rectangle_slide()  # 矩形
-    ppt.create_rhombus_slide()    # 菱形
-    ppt.create_square_slide()     # 正方形
-    
-    # 创建梯形章节
-    print("创建梯形章节...")
-    ppt.create_trapezoid_intro()       # 梯形定义
-    ppt.create_trapezoid_classification()  # 梯形分类
-    ppt.create_trapezoid_properties()   # 梯形性质
-    
-    # 创建总结和练习题
-    print("创建总结和练习题...")
-    ppt.create_summary_slide()         # 总结幻灯片
-    ppt.create_exercises_slide()       # 练习题幻灯片
-    
-    # 保存PPT文件
-    ppt.save()
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="生成四边形章节PPT")
+    parser.add_argument('-o', '--output', default="四边形.pptx",
+                        help="输出文件路径（默认：四边形.pptx）")
+    parser.add_argument('--manifest', metavar='FILE',
+                        help="批量任务清单（JSON），指定后忽略-o和内容选择参数")
+    parser.add_argument('--content', metavar='CSV',
+                        help="从内容表格（列：" + ",".join(CONTENT_COLUMNS) + "）生成PPT，"
+                             "每个deck一套，输出文件名加deck后缀")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="并行进程数，指定--threads时为线程数（默认：1）")
+    parser.add_argument('--threads', action='store_true',
+                        help="用线程而不是进程并行生成（不能与--max-rss同时使用）")
+    parser.add_argument('--max-rss', type=int, metavar='MB',
+                        help="工作进程内存上限（MB），超过后回收进程")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="用tracemalloc记录每套PPT之后的内存增长")
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help="整套PPT结果和图形库缓存目录，不指定则不使用缓存")
+    parser.add_argument('--renderer', choices=RENDERERS, default='raster',
+                        help="图形渲染方式：raster位图，native原生形状（默认：raster）")
+    parser.add_argument('--dpi-profile', choices=sorted(DPI_PROFILES), default='print',
+                        help="位图分辨率档位（默认：print，300dpi）")
+    parser.add_argument('--deterministic', action='store_true',
+                        help="确定性构建，相同输入生成逐字节相同的文件")
+    parser.add_argument('--locale', nargs='+', choices=LOCALES, metavar='LOCALE',
+                        help="幻灯片语言：" + "、".join(LOCALES) + "；指定多种时输出文件名加语言后缀")
+    parser.add_argument('--asset-pack', metavar='FILE',
+                        help="使用共享资源包（各工作进程只读映射同一个文件，不再各自渲染图形）")
+    parser.add_argument('--build-asset-pack', metavar='FILE',
+                        help="按--locale和--dpi-profile把图形库和模板写入资源包后退出")
+    parser.add_argument('--size-budget', type=float, metavar='MB',
+                        help="每个文件的体积上限（MB），超出时降低图片分辨率和颜色数")
+    parser.add_argument('--html', metavar='FILE',
+                        help="同时导出可拖动顶点的交互式HTML页面")
+    parser.add_argument('--build-steps', action='store_true',
+                        help="图形按单击逐步出现（如先画平行四边形，再画对角线）")
+    parser.add_argument('--answer-key', action='store_true',
+                        help="在练习题之后为每道题生成解答幻灯片（解题步骤和标注图形）")
+    parser.add_argument('--fast-text', action='store_true',
+                        help="纯文字幻灯片直接由OOXML模板生成（输出相同，速度更快）")
+    parser.add_argument('--benchmark-text', type=int, metavar='ROUNDS',
+                        help="比较纯文字幻灯片两种生成方式的吞吐量后退出")
+    parser.add_argument('--benchmark-threads', type=int, metavar='DECKS',
+                        help="分别用1、2、4个线程各生成DECKS套PPT，比较吞吐量后退出")
+    parser.add_argument('--golden', metavar='DIR',
+                        help="逐个create_*方法与DIR中的黄金基准比较（XML和图片感知差异）后退出")
+    parser.add_argument('--update-golden', action='store_true',
+                        help="与--golden一起使用：按当前输出重新生成基准")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="不打印进度信息")
+    parser.add_argument('--sections', nargs='+', metavar='SECTION',
+                        help="只生成指定章节：" + "、".join(dict.fromkeys(sec for _, sec, _ in SLIDE_REGISTRY)))
+    parser.add_argument('--slides', nargs='+', metavar='METHOD',
+                        help="只生成指定的幻灯片（create_*方法名）")
+    parser.add_argument('--no-frame', action='store_true',
+                        help="选择部分内容时不自动包含封面和目录")
+    parser.add_argument('--with-dependencies', action='store_true',
+                        help="自动包含所选幻灯片依赖的前置幻灯片")
+    parser.add_argument('--list-slides', action='store_true',
+                        help="列出可选的幻灯片和章节后退出")
+    parser.add_argument('--list-diagrams', action='store_true',
+                        help="列出图形库中的图形后退出")
+    args = parser.parse_args(argv)
+    
+    if args.list_slides:
+        for name, section, deps in SLIDE_REGISTRY:
+            print(f"{section:<14}{name}" + (f"  (依赖: {', '.join(deps)})" if deps else ""))
+        return 0
+    
+    if args.list_diagrams:
+        for name, (_, description) in DIAGRAM_LIBRARY.items():
+            print(f"{name:<30}{description}")
+        return 0
+    
+    if args.threads and args.max_rss:
+        parser.error("--threads不能与--max-rss同时使用（内存上限按进程计算）")
+    
+    if args.benchmark_threads:
+        result = benchmark_threads(args.benchmark_threads, renderer=args.renderer,
+                                   dpi=DPI_PROFILES[args.dpi_profile])
+        for count in (1, 2, 4):
+            print(f"{count}个线程: {result[count]:.2f} 套/秒（{result[count] / result[1]:.2f}倍）")
+        print("输出一致" if result['consistent'] else "输出不一致")
+        return 0 if result['consistent'] else 1
+    
+    if args.golden:
+        try:
+            slides = resolve_slides(args.slides, args.sections, include_frame=not args.no_frame)
+        except ValueError as e:
+            parser.error(str(e))
+        started = time.perf_counter()
+        try:
+            results = run_golden(args.golden, update=args.update_golden, slides=slides,
+                                 workers=args.workers if args.workers > 1 else None,
+                                 renderer=args.renderer, dpi=DPI_PROFILES[args.dpi_profile],
+                                 locale=args.locale[0] if args.locale else SOURCE_LOCALE,
+                                 build_steps=args.build_steps, answer_key=args.answer_key)
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 1
+        for result in results:
+            if args.update_golden:
+                print(f"{result['name']:<45}已更新（{result['parts']}个部件）")
+            elif result['ok']:
+                print(f"{result['name']:<45}一致 ({result['seconds']:.2f}s)")
+            else:
+                print(f"{result['name']:<45}不同")
+                if result.get('error'):
+                    print(f"  {result['error']}")
+                for part in result['missing']:
+                    print(f"  缺少: {part}")
+                for part in result['extra']:
+                    print(f"  多出: {part}")
+                for part, score in result['images'].items():
+                    print(f"  图片 {part}: 差异{score:.2%}")
+                for part, diff in result['xml'].items():
+                    print(f"  XML {part}:")
+                    for line in diff:
+                        print(f"    {line}")
+        failed = sum(not result['ok'] for result in results)
+        print(f"共{len(results)}个方法，{failed}个不同，用时{time.perf_counter() - started:.2f}s")
+        return 1 if failed else 0
+    
+    if args.build_asset_pack:
+        index = build_asset_pack(args.build_asset_pack, args.locale or (SOURCE_LOCALE,),
+                                 (DPI_PROFILES[args.dpi_profile],))
+        if not args.quiet:
+            print(f"资源包已写入 {args.build_asset_pack}：{len(index['diagrams'])}幅图形，"
+                  f"{len(index['blobs'])}段内容，{os.path.getsize(args.build_asset_pack) / 2**20:.1f}MB")
+        return 0
+    
+    if args.benchmark_text:
+        result = benchmark_text_slides(args.benchmark_text, args.locale[0] if args.locale else SOURCE_LOCALE)
+        print(f"对象模型: {result['object_model']:.0f} 张/秒")
+        print(f"OOXML模板: {result['fast_text']:.0f} 张/秒"
+              f"（{result['fast_text'] / result['object_model']:.1f}倍）")
+        print("输出一致" if result['equivalent'] else "输出不一致")
+        return 0 if result['equivalent'] else 1
+    
+    if args.manifest:
+        try:
+            jobs = load_manifest(args.manifest)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"无法读取任务清单: {e}")
+        # 清单中未指定的选项使用命令行参数
+        for job in jobs:
+            job.setdefault('renderer', args.renderer)
+            job.setdefault('dpi_profile', args.dpi_profile)
+            job.setdefault('deterministic', args.deterministic)
+            job.setdefault('build_steps', args.build_steps)
+            job.setdefault('fast_text', args.fast_text)
+            job.setdefault('answer_key', args.answer_key)
+            job.setdefault('asset_pack', args.asset_pack)
+            if args.size_budget and 'max_bytes' not in job:
+                job['max_bytes'] = int(args.size_budget * 2**20)
+            if args.locale and 'locale' not in job and 'locales' not in job:
+                # 与单个文件相同：只指定一种语言时不加语言后缀
+                if len(args.locale) > 1:
+                    job['locales'] = args.locale
+                else:
+                    job['locale'] = args.locale[0]
+    elif args.content:
+        # 先完整校验一遍（同样是流式读取），有错误时不生成任何文件
+        try:
+            decks = sum(1 for _ in iter_content_decks(args.content))
+        except (OSError, ValueError) as e:
+            parser.error(f"无法读取内容表格: {e}")
+        if not args.quiet:
+            print(f"内容表格校验通过，共{decks}套")
+        jobs = content_jobs(args.content, args.output, renderer=args.renderer,
+                            dpi_profile=args.dpi_profile, deterministic=args.deterministic,
+                            build_steps=args.build_steps, fast_text=args.fast_text,
+                            asset_pack=args.asset_pack,
+                            max_bytes=int(args.size_budget * 2**20) if args.size_budget else None,
+                            locales=args.locale if args.locale and len(args.locale) > 1 else None,
+                            locale=args.locale[0] if args.locale else SOURCE_LOCALE)
+    else:
+        try:
+            resolve_slides(args.slides, args.sections)
+        except ValueError as e:
+            parser.error(str(e))
+        jobs = [{
+            'output': args.output,
+            'slides': args.slides,
+            'sections': args.sections,
+            'no_frame': args.no_frame,
+            'with_dependencies': args.with_dependencies,
+            'renderer': args.renderer,
+            'dpi_profile': args.dpi_profile,
+            'deterministic': args.deterministic,
+            'build_steps': args.build_steps,
+            'fast_text': args.fast_text,
+            'answer_key': args.answer_key,
+            'asset_pack': args.asset_pack,
+            'max_bytes': int(args.size_budget * 2**20) if args.size_budget else None,
+            'html': args.html,
+            'locales': args.locale if args.locale and len(args.locale) > 1 else None,
+            'locale': args.locale[0] if args.locale else SOURCE_LOCALE,
+        }]
+    
+    if not args.quiet:
+        print("开始生成四边形PPT...")
+    results = run_jobs(jobs, workers=args.workers, cache_dir=args.cache_dir, quiet=args.quiet,
+                       max_rss=args.max_rss * 2**20 if args.max_rss else None,
+                       trace_memory=args.trace_memory, threads=args.threads)
+    return 0 if all(r['ok'] for r in results) else 1
     
 if __name__ == "__main__":
 
-    main()
+    sys.exit(main())